@@ -0,0 +1,264 @@
+""" Campagne de benchmarks reproductible : balaye les grilles solveur × Korf N × instances PRP (dimensions, nombre de
+rectangles, graine), mesure chaque cas dans un processus dédié et écrit les résultats en JSON / CSV. Deux fichiers de
+résultats peuvent ensuite être comparés pour repérer les régressions.
+
+Utilisation (depuis la racine du projet) :
+    python -m benchmarks.campagne lance --solveurs DFS DFSSolverPRP --korf 6 7 8 --prp 20x15x20:0-4 -o res.json res.csv
+    python -m benchmarks.campagne compare reference.json res.json --seuil 0.10
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mesure de la mémoire
+    resource = None
+
+from benchmarks.korf import BenchmarkKorf
+from benchmarks.prp_generator import GenerateurPRP, lit_grille_prp
+from solvers.registre import SOLVEURS_DEMONS, classe_solveur
+from utils.conteneur_optimal import ChercheurConteneurOptimal
+
+# Solveurs réservés au Perfect Rectangle Packing (les carrés de Korf n'admettent pas d'emballage parfait)
+SOLVEURS_PRP_SEULEMENT = ("DFSSolverPRP",)
+
+
+def genere_cas(solveurs, korf_n=(), prp=()):
+    """ Retourne la liste des cas à mesurer. prp est une liste de tuples (largeur, hauteur, nb_rectangles, graine).
+    Un cas est un dictionnaire sérialisable : {"solveur", "famille" ("korf" ou "prp"), "parametres", "instance"}. """
+    cas = []
+    for nom in solveurs:
+        if nom not in SOLVEURS_DEMONS:  # chaque cas est mesuré dans un processus démon
+            raise ValueError(f"Solveur inconnu ou interdit dans une campagne : {nom!r} "
+                             f"(attendu : {', '.join(SOLVEURS_DEMONS)})")
+        if nom not in SOLVEURS_PRP_SEULEMENT:
+            for n in korf_n:
+                cas.append({"solveur": nom, "famille": "korf", "parametres": {"n": n}, "instance": f"korf-{n}"})
+        for largeur, hauteur, nb, graine in prp:
+            cas.append({"solveur": nom, "famille": "prp",
+                        "parametres": {"largeur": largeur, "hauteur": hauteur, "nb": nb, "graine": graine},
+                        "instance": f"prp-{largeur}x{hauteur}x{nb}-s{graine}"})
+    return cas
+
+
+def _memoire_max_ko():
+    """ Pic de mémoire résidente du processus courant (Ko), ou None si la mesure est indisponible. """
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pic // 1024 if sys.platform == "darwin" else pic  # octets sous macOS, Ko sous Linux
+
+
+def _mesure_cas(connexion, cas):
+    """ Tâche exécutée dans un processus fils : résout le cas et renvoie ses mesures par le tube. Korf : recherche du
+    conteneur optimal, statistiques cumulées sur tous les candidats. PRP : emballage dans le conteneur de
+    l'instance. """
+    classe = classe_solveur(cas["solveur"])
+    parametres = cas["parametres"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        if cas["famille"] == "korf":
+            chercheur = ChercheurConteneurOptimal(BenchmarkKorf(parametres["n"]).obtenir_rectangles(), classe)
+            debut = time.perf_counter()
+            dimensions, solveur = chercheur.trouve_conteneur_optimal()
+            duree = time.perf_counter() - debut
+            resultat = list(dimensions) if dimensions else None
+            statistiques = chercheur.stats.vers_dict()
+        else:
+            generateur = GenerateurPRP(parametres["largeur"], parametres["hauteur"], parametres["nb"],
+                                       seed=parametres["graine"], taille_min=2, ratio_min=0.2)
+            rectangles = generateur.obtenir_rectangles_melanges()
+            solveur = classe(parametres["largeur"], parametres["hauteur"])
+            debut = time.perf_counter()
+            resultat = solveur.emballe(rectangles)
+            duree = time.perf_counter() - debut
+            statistiques = solveur.stats.vers_dict()
+
+    connexion.send({"duree_s": duree, "resultat": resultat, "statistiques": statistiques,
+                    "memoire_max_ko": _memoire_max_ko()})
+    connexion.close()
+
+
+def execute_cas(cas, repetitions=1, delai=None):
+    """ Mesure le cas repetitions fois, chacune dans un processus neuf (pas d'état partagé entre cas), et retourne
+    la ligne de résultat. On garde la durée minimale, la moins bruitée. delai : temps maximal (secondes) par
+    exécution ; au-delà le cas est marqué "delai_depasse". """
+    contexte = multiprocessing.get_context()
+    mesures = []
+    statut = "ok"
+    for _ in range(repetitions):
+        reception, emission = contexte.Pipe(duplex=False)
+        processus = contexte.Process(target=_mesure_cas, args=(emission, cas), daemon=True)
+        processus.start()
+        emission.close()
+        if not reception.poll(delai):
+            processus.terminate()
+            statut = "delai_depasse"
+        else:
+            try:
+                mesures.append(reception.recv())
+            except EOFError:
+                statut = "erreur"
+        processus.join()
+        reception.close()
+        if statut != "ok":
+            break
+
+    ligne = dict(cas, statut=statut, repetitions=len(mesures))
+    if mesures:
+        meilleure = min(mesures, key=lambda m: m["duree_s"])
+        statistiques = meilleure["statistiques"]
+        noeuds = statistiques["noeuds"]
+        ligne.update(
+            duree_s=round(meilleure["duree_s"], 6),
+            resultat=meilleure["resultat"],
+            noeuds=noeuds,
+            noeuds_par_s=round(noeuds / meilleure["duree_s"]) if noeuds and meilleure["duree_s"] > 0 else None,
+            elagages=statistiques["elagages"],
+            compteurs=statistiques["compteurs"],
+            memoire_max_ko=max((m["memoire_max_ko"] or 0) for m in mesures) or None,
+        )
+    return ligne
+
+
+def _commit_git():
+    """ Commit courant du dépôt, ou None (hors dépôt git). """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def lance_campagne(cas, repetitions=1, delai=None, affiche=True):
+    """ Exécute tous les cas, dans l'ordre, et retourne le document de résultats (métadonnées + lignes). """
+    lignes = []
+    for numero, c in enumerate(cas, 1):
+        ligne = execute_cas(c, repetitions, delai)
+        lignes.append(ligne)
+        if affiche:
+            duree = f"{ligne['duree_s']:.3f}s" if "duree_s" in ligne else "-"
+            print(f"[{numero}/{len(cas)}] {c['solveur']:<13} {c['instance']:<22} {ligne['statut']:<14} {duree:>10}"
+                  f"  noeuds={ligne.get('noeuds')}")
+    return {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit_git(),
+            "python": platform.python_version(),
+            "plateforme": platform.platform(),
+            "processeur": platform.processor() or platform.machine(),
+            "nb_coeurs": os.cpu_count(),
+            "repetitions": repetitions,
+        },
+        "resultats": lignes,
+    }
+
+
+def ecrit_json(document, chemin):
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        json.dump(document, fichier, indent=2, ensure_ascii=False)
+
+
+def ecrit_csv(document, chemin):
+    """ Une ligne par cas ; les paramètres, les élagages (préfixe elagages_) et les autres compteurs deviennent des
+    colonnes. """
+    lignes = document["resultats"]
+    noms_parametres = sorted({nom for l in lignes for nom in l["parametres"]})
+    noms_elagages = sorted({"elagages_" + nom for l in lignes for nom in l.get("elagages", {})})
+    noms_compteurs = sorted({nom for l in lignes for nom in l.get("compteurs", {})})
+    colonnes = (["solveur", "famille", "instance"] + noms_parametres +
+                ["statut", "resultat", "duree_s", "noeuds", "noeuds_par_s", "memoire_max_ko"] + noms_elagages +
+                noms_compteurs)
+    with open(chemin, "w", newline="", encoding="utf-8") as fichier:
+        ecrivain = csv.DictWriter(fichier, fieldnames=colonnes)
+        ecrivain.writeheader()
+        for l in lignes:
+            ligne = {nom: l.get(nom) for nom in colonnes}
+            ligne.update(l["parametres"])
+            ligne.update({"elagages_" + nom: nombre for nom, nombre in l.get("elagages", {}).items()})
+            ligne.update(l.get("compteurs", {}))
+            ecrivain.writerow(ligne)
+
+
+def lit_resultats(chemin):
+    with open(chemin, encoding="utf-8") as fichier:
+        return json.load(fichier)
+
+
+def compare(reference, nouveau, seuil=0.10, duree_min=0.01):
+    """ Compare deux documents de résultats cas par cas (même solveur, même instance) et retourne la liste des
+    régressions, chacune (solveur, instance, motif). Sont signalés : un résultat ou un statut différent, une durée
+    en hausse de plus de seuil (relatif, ignoré sous duree_min secondes, trop bruité), un nombre de nœuds en hausse
+    de plus de seuil. """
+    index = {(l["solveur"], l["instance"]): l for l in reference["resultats"]}
+    regressions = []
+    for l in nouveau["resultats"]:
+        cle = (l["solveur"], l["instance"])
+        ref = index.get(cle)
+        if ref is None:
+            continue
+        if l["statut"] != ref["statut"] or l.get("resultat") != ref.get("resultat"):
+            regressions.append((*cle, f"résultat {ref.get('resultat')} ({ref['statut']}) -> "
+                                      f"{l.get('resultat')} ({l['statut']})"))
+            continue
+        if l["statut"] != "ok":
+            continue
+        if max(l["duree_s"], ref["duree_s"]) >= duree_min and l["duree_s"] > ref["duree_s"] * (1 + seuil):
+            regressions.append((*cle, f"durée {ref['duree_s']:.3f}s -> {l['duree_s']:.3f}s "
+                                      f"(+{100 * (l['duree_s'] / ref['duree_s'] - 1):.0f}%)"))
+        if ref.get("noeuds") and l.get("noeuds") and l["noeuds"] > ref["noeuds"] * (1 + seuil):
+            regressions.append((*cle, f"noeuds {ref['noeuds']} -> {l['noeuds']} "
+                                      f"(+{100 * (l['noeuds'] / ref['noeuds'] - 1):.0f}%)"))
+    return regressions
+
+
+def main(arguments=None):
+    analyseur = argparse.ArgumentParser(prog="python -m benchmarks.campagne", description=__doc__.split("\n\n")[0])
+    commandes = analyseur.add_subparsers(dest="commande", required=True)
+
+    lance = commandes.add_parser("lance", help="exécute une grille de benchmarks")
+    lance.add_argument("--solveurs", nargs="+", default=list(SOLVEURS_DEMONS), choices=SOLVEURS_DEMONS)
+    lance.add_argument("--korf", nargs="*", type=int, default=[], metavar="N")
+    lance.add_argument("--prp", nargs="*", default=[], metavar="LxHxN:G1-G2")
+    lance.add_argument("--repetitions", type=int, default=1)
+    lance.add_argument("--delai", type=float, default=None, help="temps maximal par exécution (s)")
+    lance.add_argument("-o", "--sorties", nargs="+", default=["resultats.json"], help="fichiers .json et/ou .csv")
+
+    comparaison = commandes.add_parser("compare", help="compare deux fichiers de résultats JSON")
+    comparaison.add_argument("reference")
+    comparaison.add_argument("nouveau")
+    comparaison.add_argument("--seuil", type=float, default=0.10, help="hausse relative tolérée (0.10 = 10%%)")
+
+    args = analyseur.parse_args(arguments)
+
+    if args.commande == "lance":
+        grille_prp = [instance for specification in args.prp for instance in lit_grille_prp(specification)]
+        document = lance_campagne(genere_cas(args.solveurs, args.korf, grille_prp), args.repetitions, args.delai)
+        for sortie in args.sorties:
+            if sortie.endswith(".csv"):
+                ecrit_csv(document, sortie)
+            else:
+                ecrit_json(document, sortie)
+            print(f"Résultats écrits dans {sortie}")
+        return 0
+
+    regressions = compare(lit_resultats(args.reference), lit_resultats(args.nouveau), args.seuil)
+    for solveur, instance, motif in regressions:
+        print(f"RÉGRESSION  {solveur:<13} {instance:<22} {motif}")
+    if not regressions:
+        print("Aucune régression.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+""" Corpus d'instances sur disque, au format binaire compact : chaque instance est stockée sous forme d'entiers 32 bits
+(dimensions du conteneur puis un enregistrement (largeur, hauteur, x, y) par rectangle), suivie d'un index des
+positions des instances. La lecture passe par un mmap : l'instance k est lue sans parcourir le fichier, et les pages
+du fichier sont partagées entre les processus qui ouvrent le même corpus.
+
+Format (petit-boutiste) :
+    en-tête    : "RPCORP01" | nb_instances (uint64) | position de l'index (uint64)
+    instance   : largeur (int32) | hauteur (int32) | n (int32) | n × (largeur, hauteur, x, y) (int32)
+    index      : nb_instances × position de l'instance (uint64)
+Une position x / y vaut -1 pour un rectangle sans position de référence. """
+
+import mmap
+import struct
+import sys
+from array import array
+
+from benchmarks.prp_generator import GenerateurPRP
+from models.rectangle import Rectangle
+
+MAGIQUE = b"RPCORP01"
+_EN_TETE = struct.Struct("<8sQQ")
+_INSTANCE = struct.Struct("<iii")
+_POSITION = struct.Struct("<Q")
+_SANS_POSITION = -1
+
+
+def _en_petit_boutiste(valeurs):
+    """ Retourne l'array d'entiers en ordre petit-boutiste (inversé sur une machine gros-boutiste). """
+    if sys.byteorder != "little":
+        valeurs.byteswap()
+    return valeurs
+
+
+class EcrivainCorpus:
+    """ Écrit un corpus instance par instance, sans garder les instances en mémoire (seul l'index, 8 octets par
+    instance, l'est). À utiliser comme gestionnaire de contexte : l'index et l'en-tête sont écrits à la fermeture. """
+
+    def __init__(self, chemin):
+        self.fichier = open(chemin, "wb")
+        self.fichier.write(_EN_TETE.pack(MAGIQUE, 0, 0))
+        self.positions = array("Q")
+
+    def ajoute(self, largeur, hauteur, rectangles):
+        """ Ajoute une instance : conteneur largeur × hauteur et rectangles (objets Rectangle, positions conservées
+        si elles existent). Retourne le numéro de l'instance. """
+        self.positions.append(self.fichier.tell())
+        self.fichier.write(_INSTANCE.pack(largeur, hauteur, len(rectangles)))
+        enregistrements = array("i")
+        for r in rectangles:
+            place = r.est_place()
+            enregistrements.extend((r.largeur, r.hauteur, r.x if place else _SANS_POSITION,
+                                    r.y if place else _SANS_POSITION))
+        self.fichier.write(_en_petit_boutiste(enregistrements).tobytes())
+        return len(self.positions) - 1
+
+    def ferme(self):
+        if self.fichier.closed:
+            return
+        position_index = self.fichier.tell()
+        self.fichier.write(_en_petit_boutiste(array("Q", self.positions)).tobytes())
+        self.fichier.seek(0)
+        self.fichier.write(_EN_TETE.pack(MAGIQUE, len(self.positions), position_index))
+        self.fichier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.ferme()
+
+
+class Corpus:
+    """ Lecteur d'un corpus écrit par EcrivainCorpus, en accès direct : corpus[k] ou corpus.obtenir_rectangles(k)
+    ne lisent que l'instance k. Un Corpus se transmet à un autre processus par son seul chemin (le fils rouvre le
+    fichier et partage les mêmes pages en mémoire). """
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        with open(chemin, "rb") as fichier:
+            self._mmap = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        magique, self._nb_instances, self._position_index = _EN_TETE.unpack_from(self._mmap, 0)
+        if magique != MAGIQUE:
+            self._mmap.close()
+            raise ValueError(f"{chemin} n'est pas un corpus d'instances (en-tête {magique!r})")
+
+    def __len__(self):
+        return self._nb_instances
+
+    def _position(self, k):
+        if not 0 <= k < self._nb_instances:
+            raise IndexError(f"instance {k} hors du corpus ({self._nb_instances} instances)")
+        return _POSITION.unpack_from(self._mmap, self._position_index + _POSITION.size * k)[0]
+
+    def dimensions(self, k):
+        """ Retourne (largeur, hauteur, nombre de rectangles) de l'instance k. """
+        return _INSTANCE.unpack_from(self._mmap, self._position(k))
+
+    def enregistrements(self, k):
+        """ Retourne les enregistrements de l'instance k, à plat (largeur, hauteur, x, y, largeur, ...). Sur une
+        machine petit-boutiste, c'est une vue sur le fichier, sans copie (à libérer avant ferme()). """
+        debut = self._position(k) + _INSTANCE.size
+        _, _, n = _INSTANCE.unpack_from(self._mmap, debut - _INSTANCE.size)
+        vue = memoryview(self._mmap)[debut:debut + 16 * n]
+        if sys.byteorder == "little":
+            return vue.cast("i")
+        return _en_petit_boutiste(array("i", vue.tobytes()))
+
+    def obtenir_rectangles(self, k):
+        """ Retourne les rectangles de l'instance k (identifiants 1..n) avec leur position de référence. """
+        valeurs = self.enregistrements(k)
+        rectangles = []
+        for i in range(0, len(valeurs), 4):
+            rect = Rectangle(valeurs[i], valeurs[i + 1], id=i // 4 + 1)
+            if valeurs[i + 2] != _SANS_POSITION:
+                rect.x, rect.y = valeurs[i + 2], valeurs[i + 3]
+            rectangles.append(rect)
+        return rectangles
+
+    def obtenir_rectangles_a_placer(self, k):
+        """ Retourne les rectangles de l'instance k sans position : c'est cette liste qui est passée au solveur. """
+        valeurs = self.enregistrements(k)
+        return [Rectangle(valeurs[i], valeurs[i + 1], id=i // 4 + 1) for i in range(0, len(valeurs), 4)]
+
+    def __getitem__(self, k):
+        """ Retourne (largeur, hauteur, rectangles avec leur position de référence) de l'instance k. """
+        largeur, hauteur, _ = self.dimensions(k)
+        return largeur, hauteur, self.obtenir_rectangles(k)
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def ferme(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.ferme()
+
+    def __reduce__(self):
+        return Corpus, (self.chemin,)
+
+
+def ecrit_corpus_prp(chemin, largeur, hauteur, nb_rectangles, graines, taille_min=2, ratio_min=0.2):
+    """ Écrit un corpus d'instances PRP (une par graine) avec leur solution de référence. Retourne le nombre
+    d'instances écrites. """
+    with EcrivainCorpus(chemin) as ecrivain:
+        for graine in graines:
+            generateur = GenerateurPRP(largeur, hauteur, nb_rectangles, seed=graine, taille_min=taille_min,
+                                       ratio_min=ratio_min)
+            ecrivain.ajoute(largeur, hauteur, generateur.obtenir_rectangles())
+        return len(ecrivain.positions)
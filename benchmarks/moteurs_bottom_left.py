@@ -0,0 +1,65 @@
+""" Compare les moteurs de Bottom-Left (voir BottomLeft.MOTEURS) sur des instances PRP mélangées : temps de résolution
+et placements, qui doivent être identiques à ceux du balayage complet (trouve_bottom_left, la référence). Le
+conteneur a la largeur de l'instance et une hauteur doublée, pour que tous les rectangles soient placés.
+
+Utilisation (depuis la racine du projet) :
+    python -m benchmarks.moteurs_bottom_left --prp 40x30x60:0-4 80x60x200:0-2 --moteurs balayage candidats numpy
+"""
+
+import argparse
+import time
+
+from benchmarks.prp_generator import GenerateurPRP, lit_grille_prp
+from solvers.bottom_left import BottomLeft
+
+
+def mesure(rectangles, largeur, hauteur, moteur, repetitions=1):
+    """ Retourne (meilleure durée en secondes, placements (id, x, y) triés, succès) du moteur sur l'instance. """
+    meilleure = None
+    for _ in range(repetitions):
+        solveur = BottomLeft(largeur, hauteur, moteur=moteur)
+        debut = time.perf_counter()
+        succes = solveur.emballe(rectangles, ordre="aucun")
+        duree = time.perf_counter() - debut
+        meilleure = duree if meilleure is None else min(meilleure, duree)
+    placements = sorted((r.id, r.x, r.y) for r in rectangles if r.est_place())
+    return meilleure, placements, succes
+
+
+def compare_moteurs(grille, moteurs, repetitions=1):
+    """ Mesure chaque moteur sur chaque instance (largeur, hauteur, nb, graine) de la grille et affiche les durées.
+    Retourne la liste des instances dont les placements diffèrent de ceux du balayage. """
+    differences = []
+    print(f"{'instance':<24}" + "".join(f"{moteur:>12}" for moteur in moteurs) + "  placements")
+    for largeur, hauteur, nb, graine in grille:
+        rectangles = GenerateurPRP(largeur, hauteur, nb, seed=graine, taille_min=2,
+                                   ratio_min=0.2).obtenir_rectangles_melanges()
+        reference = mesure(rectangles, largeur, 2 * hauteur, "balayage")[1:]
+        durees = []
+        identiques = True
+        for moteur in moteurs:
+            duree, placements, succes = mesure(rectangles, largeur, 2 * hauteur, moteur, repetitions)
+            durees.append(duree)
+            identiques &= (placements, succes) == reference
+        nom = f"prp-{largeur}x{hauteur}x{nb}-s{graine}"
+        if not identiques:
+            differences.append(nom)
+        print(f"{nom:<24}" + "".join(f"{duree:>11.4f}s" for duree in durees) +
+              ("  identiques" if identiques else "  DIFFÉRENTS"))
+    return differences
+
+
+def main(arguments=None):
+    analyseur = argparse.ArgumentParser(prog="python -m benchmarks.moteurs_bottom_left",
+                                        description=__doc__.split("\n\n")[0])
+    analyseur.add_argument("--prp", nargs="+", default=["40x30x60:0-2", "80x60x200:0-2"], metavar="LxHxN:G1-G2")
+    analyseur.add_argument("--moteurs", nargs="+", default=list(BottomLeft.MOTEURS), choices=BottomLeft.MOTEURS)
+    analyseur.add_argument("--repetitions", type=int, default=3)
+    args = analyseur.parse_args(arguments)
+
+    grille = [instance for specification in args.prp for instance in lit_grille_prp(specification)]
+    return 1 if compare_moteurs(grille, args.moteurs, args.repetitions) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,6 +2,16 @@
 
 import random
 from models.rectangle import Rectangle
+from utils.validation import valide_placement
+
+
+def lit_grille_prp(specification):
+    """ "LxHxN:G" ou "LxHxN:G1-G2" -> liste de (largeur, hauteur, nb, graine). Format des grilles d'instances de la
+    ligne de commande et des benchmarks. """
+    dimensions, _, graines = specification.partition(":")
+    largeur, hauteur, nb = (int(v) for v in dimensions.lower().split("x"))
+    debut, _, fin = (graines or "0").partition("-")
+    return [(largeur, hauteur, nb, g) for g in range(int(debut), int(fin or debut) + 1)]
 
 
 class GenerateurPRP:
@@ -124,18 +134,11 @@ class GenerateurPRP:
         return copies
 
     def verifier_partition(self):
-        """ Vérifie que les rectangles couvrent exactement le conteneur sans chevauchement. """
-        aire_totale = sum(r.aire() for r in self.rectangles)
-        aire_conteneur = self.largeur_conteneur * self.hauteur_conteneur
-        if aire_totale != aire_conteneur:
-            print(f"Erreur : aire totale {aire_totale} != aire conteneur {aire_conteneur}")
-            return False
-        for i, r1 in enumerate(self.rectangles):
-            for r2 in self.rectangles[i + 1:]:
-                if r1.chevauche(r2):
-                    print(f"Erreur : chevauchement entre rect {r1.id} et {r2.id}")
-                    return False
-        return True
+        """ Vérifie que les rectangles couvrent exactement le conteneur sans chevauchement (balayage en O(n log n)). """
+        rapport = valide_placement(self.rectangles, self.largeur_conteneur, self.hauteur_conteneur, parfait=True)
+        for erreur in rapport.erreurs():
+            print(f"Erreur : {erreur}")
+        return bool(rapport)
 
     def affiche_info(self):
         """ Affiche un résumé de l'instance générée. """
@@ -1,58 +1,224 @@
-""" Point d'entrée principal du projet Rectangle Packing.
-Lance les benchmarks de Korf avec les différents solveurs disponibles. """
+""" Point d'entrée principal du projet Rectangle Packing : interface en ligne de commande.
 
+    python main.py resous --prp 20x15x20:42 --solveur DFSSolverPRP --rendu solution.png
+    python main.py resous --rectangles 4x3 2x5 3x3 --dimensions 6x5 --solveur DFS
+    python main.py conteneur --korf 11 --solveur DFS --processus 4
+    python main.py conteneur --korf 15 --solveur DFSDeuxPhases
+    python main.py resous --prp 20x15x20:7 --solveur Portefeuille --membres BottomLeft:croissant DFSSolverPRP DFS
+    python main.py genere --prp 20x15x20:0-99 -o instances.jsonl
+    python main.py lot instances.jsonl -o resultats.jsonl --delai 10
+    python main.py benchmark lance --korf 6 7 --prp 20x15x20:0-4 -o resultats.json
+
+Les modules (solveurs, générateurs, Matplotlib / Numpy pour le rendu) ne sont importés que par la commande qui s'en
+sert : une petite résolution démarre en quelques dizaines de millisecondes. """
+
+import argparse
+import importlib
+import sys
 import time
-from benchmarks.korf import BenchmarkKorf
-from solvers.bottom_left import BottomLeft
-from solvers.dfs import DFS
-from utils.conteneur_optimal import ChercheurConteneurOptimal
-from utils.visualisation import visualise_solution
-from benchmarks.prp_generator import GenerateurPRP
-from solvers.dfs_prp import DFSSolverPRP
 
-def run_prp(largeur, hauteur, nb_rectangles, seed=42):
-    gen = GenerateurPRP(largeur, hauteur, nb_rectangles, seed=seed, taille_min=2, ratio_min=0.2)
-    gen.affiche_info()
-    debut = time.time()
+from solvers.registre import SOLVEURS, classe_solveur  # sans import des solveurs eux-mêmes
 
-    solveur = DFSSolverPRP(largeur, hauteur)
-    succes = solveur.emballe(gen.obtenir_rectangles_melanges())
 
-    if succes:
-        print("    Solution trouvée via DFS.")
-        #solveur.affiche_stats()
-        visualise_solution(solveur, titre=f"PRP — {largeur}×{hauteur}, {nb_rectangles} rects")
+# Commandes déléguées à la ligne de commande d'un autre module : (module, fonction main), qui reçoit tous les
+# arguments suivants, y compris --help
+DELEGUEES = {
+    "benchmark": ("benchmarks.campagne", "main"),
+    "lot": ("utils.resolution_lot", "main"),
+}
 
-    fin = time.time()
-    temps_execution = fin - debut
-    print(f"Temps d'exécution : {temps_execution:.2f} secondes\n")
 
-def executer_benchmark(n, classe_solveur, nom_solveur):
-    print(f"Benchmark de Korf : N={n}, {nom_solveur}")
+def _parametres_solveur(args):
+    """ Paramètres du solveur : ordres essayés par Bottom-Left (évalués sur --processus processus, dans la limite de
+    --delai secondes), membres du portefeuille ("NOM" ou "NOM:ORDRE", sans ordre : celui de --ordre). """
+    if args.solveur == "BottomLeft" and args.essais:
+        return {"essais": args.essais, "nb_processus": args.processus or 1,
+                "budget_temps": getattr(args, "delai", None)}  # pas de --delai pour la commande conteneur
+    if args.solveur != "Portefeuille" or not args.membres:
+        return {}
+    membres = []
+    for texte in args.membres:
+        nom, _, ordre = texte.partition(":")
+        membres.append((classe_solveur(nom), ordre or None))
+    return {"membres": membres}
 
-    debut = time.time()
 
-    benchmark = BenchmarkKorf(n)
-    benchmark.affiche_info()
+def _lit_dimensions(texte):
+    """ "LxH" -> (largeur, hauteur). """
+    largeur, hauteur = (int(v) for v in texte.lower().split("x"))
+    return largeur, hauteur
 
-    chercheur = ChercheurConteneurOptimal(benchmark.obtenir_rectangles(), classe_solveur)
-    (dimensions, solveur) = chercheur.trouve_conteneur_optimal()
 
-    if solveur:
-        visualise_solution(solveur, titre=f"{nom_solveur} — Korf N={n}")
+def _generateur_prp(largeur, hauteur, nb, graine):
+    from benchmarks.prp_generator import GenerateurPRP
+    return GenerateurPRP(largeur, hauteur, nb, seed=graine, taille_min=2, ratio_min=0.2)
 
-    fin = time.time()
-    temps_execution = fin - debut
-    print(f"Temps d'exécution : {temps_execution:.2f} secondes\n")
 
+def _charge_instance(args):
+    """ Retourne (rectangles, dimensions du conteneur ou None, nom) de l'instance désignée par les arguments. """
+    if args.prp:
+        from benchmarks.prp_generator import lit_grille_prp
+        largeur, hauteur, nb, graine = lit_grille_prp(args.prp)[0]
+        generateur = _generateur_prp(largeur, hauteur, nb, graine)
+        return generateur.obtenir_rectangles_melanges(), (largeur, hauteur), f"PRP {largeur}×{hauteur}, {nb} rects"
+    if args.korf:
+        from benchmarks.korf import BenchmarkKorf
+        return BenchmarkKorf(args.korf).obtenir_rectangles(), None, f"Korf N={args.korf}"
+    if args.corpus:
+        from benchmarks.corpus import Corpus
+        chemin, _, k = args.corpus.rpartition(":")
+        with Corpus(chemin) as corpus:
+            largeur, hauteur, _ = corpus.dimensions(int(k))
+            return corpus.obtenir_rectangles_a_placer(int(k)), (largeur, hauteur), f"{chemin} #{k}"
+    from models.rectangle import Rectangle
+    rectangles = [Rectangle(*_lit_dimensions(texte), id=i) for i, texte in enumerate(args.rectangles, 1)]
+    return rectangles, None, f"{len(rectangles)} rectangles"
+
+
+def _ajoute_instance(analyseur):
+    source = analyseur.add_mutually_exclusive_group(required=True)
+    source.add_argument("--prp", metavar="LxHxN:G", help="instance PRP générée (graine G)")
+    source.add_argument("--korf", type=int, metavar="N", help="carrés 1×1 à N×N")
+    source.add_argument("--corpus", metavar="CHEMIN:K", help="instance K d'un corpus binaire")
+    source.add_argument("--rectangles", nargs="+", metavar="LxH", help="dimensions des rectangles")
+    analyseur.add_argument("--solveur", default="DFSSolverPRP", choices=list(SOLVEURS))
+    analyseur.add_argument("--ordre", default="decroissant", choices=["decroissant", "croissant", "aucun"])
+    analyseur.add_argument("--processus", type=int, default=None, help="nombre de processus (défaut : 1)")
+    analyseur.add_argument("--membres", nargs="+", metavar="NOM[:ORDRE]", help="membres du Portefeuille")
+    analyseur.add_argument("--essais", type=int, default=None, help="ordres essayés par BottomLeft")
+    analyseur.add_argument("--stats", action="store_true", help="affiche les statistiques du solveur")
+    analyseur.add_argument("--rendu", metavar="FICHIER", help="écrit la solution en image (.png, .svg...)")
+    analyseur.add_argument("--affiche", action="store_true", help="affiche la solution dans une fenêtre")
+
+
+def _rendu(args, solveur, titre):
+    if args.rendu or args.affiche:
+        from utils.visualisation import visualise_solution
+        visualise_solution(solveur, titre=titre, fichier=args.rendu)
+
+
+def commande_resous(args):
+    """ Emballe une instance dans un conteneur donné (--dimensions, ou celui de l'instance PRP / du corpus). """
+    rectangles, dimensions, nom = _charge_instance(args)
+    if args.dimensions:
+        dimensions = _lit_dimensions(args.dimensions)
+    if dimensions is None:
+        raise SystemExit("--dimensions LxH est nécessaire pour cette instance")
+    if args.solveur == "BottomLeft" and not args.essais and ((args.processus or 1) > 1 or args.delai is not None):
+        raise SystemExit("--processus et --delai ne s'appliquent à BottomLeft qu'avec --essais N")
+
+    solveur = classe_solveur(args.solveur)(*dimensions, **_parametres_solveur(args))
+    debut = time.perf_counter()
+    if args.processus and args.processus > 1 and hasattr(solveur, "emballe_parallele"):
+        resultat = solveur.emballe_parallele(rectangles, args.ordre, args.processus, budget_temps=args.delai)
+    elif hasattr(solveur, "poursuit") or hasattr(solveur, "membres"):  # budget de temps possible
+        resultat = solveur.emballe(rectangles, args.ordre, budget_temps=args.delai)
+    else:
+        resultat = solveur.emballe(rectangles, args.ordre)
+    duree = time.perf_counter() - debut
+
+    libelle = {True: "solution trouvée", False: "aucune solution", None: "budget épuisé"}[resultat]
+    print(f"{nom} dans {dimensions[0]}×{dimensions[1]}, {args.solveur} : {libelle} "
+          f"({duree:.3f}s, {solveur.stats.noeuds} noeuds)")
+    if getattr(solveur, "vainqueur", None):
+        classe, ordre = solveur.vainqueur
+        print(f"Résultat retenu : {classe.__name__} (ordre {ordre})")
+    if args.stats:
+        solveur.affiche_stats()
+    if resultat:
+        rapport = solveur.valide()
+        if not rapport:
+            print("Solution invalide : " + "; ".join(rapport.erreurs()))
+            return 2
+        _rendu(args, solveur, f"{args.solveur} — {nom}")
+    return 0 if resultat else 1
+
+
+def commande_conteneur(args):
+    """ Cherche le plus petit conteneur de l'instance (ChercheurConteneurOptimal). """
+    from utils.conteneur_optimal import ChercheurConteneurOptimal
+
+    rectangles, _, nom = _charge_instance(args)
+    chercheur = ChercheurConteneurOptimal(rectangles, classe_solveur(args.solveur))
+    debut = time.perf_counter()
+    dimensions, solveur = chercheur.trouve_conteneur_optimal(args.ordre, nb_processus=args.processus or 1,
+                                                             parametres_solveur=_parametres_solveur(args))
+    print(f"Temps d'exécution : {time.perf_counter() - debut:.2f} secondes, {chercheur.stats.noeuds} noeuds")
+    if args.stats:
+        chercheur.stats.affiche()
+    if solveur is None:
+        return 1
+    _rendu(args, solveur, f"{args.solveur} — {nom}")
+    return 0
 
-if __name__ == "__main__":
-    """
-    for n in [14, 15]:
-        executer_benchmark(n, BottomLeft, "Bottom-Left")"""
 
-    for n in [11]:
-        executer_benchmark(n, DFS, "DFS")
+def commande_genere(args):
+    """ Écrit des instances générées dans un flux JSONL (pour la commande lot) ou dans un corpus binaire (.bin). """
+    import contextlib
+    import json
 
-    for nb in [20]:
-        run_prp(20, 15, nb, seed=42)
+    from benchmarks.prp_generator import lit_grille_prp
+
+    if args.sortie.endswith(".bin"):
+        if args.korf or len(args.prp) != 1:
+            raise SystemExit("Un corpus binaire se génère à partir d'une seule grille --prp (conteneur fixe)")
+        from benchmarks.corpus import ecrit_corpus_prp
+        grille = lit_grille_prp(args.prp[0])
+        largeur, hauteur, nb, _ = grille[0]
+        nombre = ecrit_corpus_prp(args.sortie, largeur, hauteur, nb, [graine for *_, graine in grille])
+        print(f"{nombre} instances écrites dans {args.sortie}")
+        return 0
+
+    nombre = 0
+    with contextlib.ExitStack() as pile:
+        sortie = sys.stdout if args.sortie == "-" else pile.enter_context(open(args.sortie, "w", encoding="utf-8"))
+        for specification in args.prp:
+            for largeur, hauteur, nb, graine in lit_grille_prp(specification):
+                generateur = _generateur_prp(largeur, hauteur, nb, graine)
+                instance = {"id": f"prp-{largeur}x{hauteur}x{nb}-s{graine}", "largeur": largeur, "hauteur": hauteur,
+                            "rectangles": [[r.largeur, r.hauteur] for r in generateur.obtenir_rectangles_melanges()]}
+                sortie.write(json.dumps(instance) + "\n")
+                nombre += 1
+        for n in args.korf:
+            sortie.write(json.dumps({"id": f"korf-{n}", "rectangles": [[i, i] for i in range(1, n + 1)]}) + "\n")
+            nombre += 1
+    print(f"{nombre} instances écrites dans {args.sortie}", file=sys.stderr)
+    return 0
+
+
+def main(arguments=None):
+    arguments = sys.argv[1:] if arguments is None else list(arguments)
+    if arguments and arguments[0] in DELEGUEES:
+        module, fonction = DELEGUEES[arguments[0]]
+        return getattr(importlib.import_module(module), fonction)(arguments[1:])
+
+    analyseur = argparse.ArgumentParser(prog="python main.py", description="Rectangle Packing Solver")
+    commandes = analyseur.add_subparsers(dest="commande", required=True)
+
+    resous = commandes.add_parser("resous", aliases=["solve"], help="emballe une instance dans un conteneur donné")
+    _ajoute_instance(resous)
+    resous.add_argument("--dimensions", metavar="LxH", help="conteneur (défaut : celui de l'instance)")
+    resous.add_argument("--delai", type=float, default=None,
+                        help="budget de temps (s) : DFS, Portefeuille, BottomLeft --essais")
+    resous.set_defaults(commande_fonction=commande_resous)
+
+    conteneur = commandes.add_parser("conteneur", aliases=["search-container"], help="cherche le conteneur minimal")
+    _ajoute_instance(conteneur)
+    conteneur.set_defaults(commande_fonction=commande_conteneur)
+
+    genere = commandes.add_parser("genere", aliases=["generate"], help="écrit des instances (JSONL ou corpus .bin)")
+    genere.add_argument("--prp", nargs="*", default=[], metavar="LxHxN:G1-G2")
+    genere.add_argument("--korf", nargs="*", type=int, default=[], metavar="N")
+    genere.add_argument("-o", "--sortie", default="-", help="fichier .jsonl (- : sortie standard) ou .bin")
+    genere.set_defaults(commande_fonction=commande_genere)
+
+    # Commandes déléguées (traitées avant l'analyse) : déclarées pour l'aide seulement
+    commandes.add_parser("benchmark", help="campagne de benchmarks (voir benchmarks/campagne.py)")
+    commandes.add_parser("lot", help="résolution par lots (voir utils/resolution_lot.py)")
+
+    args = analyseur.parse_args(arguments)
+    return args.commande_fonction(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 """ Modèle de base représentant un rectangle avec ses dimensions et sa position. """
 
 class Rectangle:
+    __slots__ = ('largeur', 'hauteur', 'id', 'x', 'y')
+
     def __init__(self, largeur, hauteur, id=None):
         self.largeur = largeur
         self.hauteur = hauteur
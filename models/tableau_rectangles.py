@@ -0,0 +1,35 @@
+""" Représentation compacte (struct-of-arrays) d'une liste de rectangles, utilisée par les solveurs pendant la
+recherche. """
+
+
+class TableauRectangles:
+    """ Le rectangle numéro i de la liste a pour dimensions largeurs[i] × hauteurs[i], pour aire aires[i] et pour
+    position (xs[i], ys[i]). Les solveurs ne manipulent que ces tableaux d'entiers et les numéros des rectangles : les
+    objets Rectangle de l'appelant ne sont lus qu'à la construction et ne sont modifiés que par ecrit_positions, en fin
+    de résolution. La position d'un rectangle non placé est sans signification. """
+
+    __slots__ = ('rectangles', 'largeurs', 'hauteurs', 'aires', 'xs', 'ys')
+
+    def __init__(self, rectangles):
+        self.rectangles = list(rectangles)
+        self.largeurs = [r.largeur for r in self.rectangles]
+        self.hauteurs = [r.hauteur for r in self.rectangles]
+        self.aires = [w * h for w, h in zip(self.largeurs, self.hauteurs)]
+        self.xs = [0] * len(self.rectangles)
+        self.ys = [0] * len(self.rectangles)
+
+    def __len__(self):
+        return len(self.rectangles)
+
+    def ecrit_positions(self, numeros):
+        """ Recopie dans les objets Rectangle la position des rectangles numeros (les autres sont réinitialisés) et
+        retourne la liste de ces objets, dans l'ordre de numeros. """
+        for r in self.rectangles:
+            r.reset_position()
+        places = []
+        for i in numeros:
+            r = self.rectangles[i]
+            r.x = self.xs[i]
+            r.y = self.ys[i]
+            places.append(r)
+        return places
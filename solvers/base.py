@@ -1,19 +1,73 @@
 """ Classe abstraite commune à tous les solveurs de Rectangle Packing. """
 
 from abc import ABC, abstractmethod
+from models.tableau_rectangles import TableauRectangles
+from utils.occupation import OccupationBitset
+from utils.statistiques import Statistiques
+from utils.validation import valide_placement
 
 
 class SolveurBase(ABC):
+    """ Pendant la résolution, les rectangles sont désignés par leur numéro dans self.tableau (représentation
+    compacte) et self.places liste les numéros des rectangles placés, dans l'ordre de placement. En fin de résolution,
+    _ecrit_positions recopie les positions dans les objets Rectangle et remplit rectangles_places.
+    self.stats (Statistiques) reçoit les compteurs de la dernière résolution. """
+
+    # Index d'occupation utilisé par peut_etre_place (None => parcours linéaire des rectangles placés)
+    classe_occupation = OccupationBitset
+    # Méthodes dont le temps est mesuré quand le chronométrage est activé ({règle: nom de méthode})
+    REGLES_CHRONOMETREES = {}
+    # Règles qui coupent une branche avant que le fils ne soit compté comme nœud (voir Statistiques.taux_elagage)
+    REGLES_BRANCHE = ()
+    # Une solution doit-elle couvrir exactement le conteneur (Perfect Rectangle Packing) ? Voir valide
+    EMBALLAGE_PARFAIT = False
+    # Un échec de emballe (sans budget) prouve-t-il qu'aucun placement n'existe dans le conteneur ? Faux pour une
+    # heuristique ; permet à ChercheurConteneurOptimal d'écarter les conteneurs plus petits
+    ECHEC_PROUVE = False
+
     def __init__(self, largeur, hauteur):
         self.largeur_conteneur = largeur
         self.hauteur_conteneur = hauteur
         self.rectangles_places = []
+        self.tableau = TableauRectangles([])
+        self.places = []
+        self.occupation = self.classe_occupation(largeur, hauteur) if self.classe_occupation else None
+        self.stats = Statistiques(self.REGLES_BRANCHE)
+
+    @classmethod
+    def lance_processus(cls, parametres):
+        """ Retourne True si le solveur, construit avec les paramètres nommés parametres, lance ses propres processus.
+        Un processus démon ne peut pas en lancer : ChercheurConteneurOptimal tranche alors les candidats un à un. """
+        return False
 
     @abstractmethod
     def emballe(self, rectangles):
         """ Tente de placer tous les rectangles dans le conteneur. Retourne True si tous les rectangles sont placés. """
         pass
 
+    def configure_statistiques(self, chronometre=False, profondeurs=False, rappel=None, periode_rappel=10_000):
+        """ Active les statistiques détaillées pour les prochaines résolutions (voir Statistiques) : temps par règle,
+        histogramme des profondeurs d'élagage et/ou rappel(stats) tous les periode_rappel nœuds. Sans argument,
+        revient aux seuls compteurs. Retourne l'objet Statistiques. """
+        self.stats.desinstrumente(self)
+        self.stats = Statistiques(self.REGLES_BRANCHE, chronometre, profondeurs, rappel, periode_rappel)
+        if chronometre:
+            self.stats.instrumente(self)
+        return self.stats
+
+    @property
+    def echec_prouve(self):
+        """ Vrai si le dernier échec de emballe prouve qu'aucun placement n'existe (par défaut : ECHEC_PROUVE). """
+        return self.ECHEC_PROUVE
+
+    @property
+    def noeuds_explores(self):
+        return self.stats.noeuds
+
+    def affiche_stats(self):
+        """ Affiche les statistiques de la dernière résolution. """
+        self.stats.affiche()
+
     def peut_etre_place(self, rectangle, x, y):
         """ Vérifie si un rectangle peut être placé à la position (x, y) (=> ne dépasse pas et ne chevauche pas). """
         if x < 0 or y < 0:
@@ -23,13 +77,63 @@ class SolveurBase(ABC):
         if y + rectangle.hauteur > self.hauteur_conteneur:
             return False
 
-        for place in self.rectangles_places:
-            if (x + rectangle.largeur <= place.x or place.x + place.largeur <= x or y + rectangle.hauteur <= place.y or
-                    place.y + place.hauteur <= y) : continue
+        if self.occupation is not None:
+            return self.occupation.est_libre(x, y, rectangle.largeur, rectangle.hauteur)
+
+        t = self.tableau
+        for i in self.places:
+            if (x + rectangle.largeur <= t.xs[i] or t.xs[i] + t.largeurs[i] <= x or y + rectangle.hauteur <= t.ys[i] or
+                    t.ys[i] + t.hauteurs[i] <= y) : continue
             else : return False
 
         return True
 
+    def _charge(self, rects):
+        """ Adopte rects comme rectangles à placer (numérotés dans cet ordre) et vide le conteneur. """
+        self.tableau = TableauRectangles(rects)
+        self._reinitialise_placements()
+
+    def _reinitialise_placements(self):
+        """ Vide le conteneur avant une nouvelle résolution. """
+        self.rectangles_places = []
+        self.places = []
+        if self.occupation is not None:
+            self.occupation.reinitialiser()
+
+    def _placer(self, i, x, y):
+        """ Place le rectangle numéro i en (x, y) et met à jour l'index d'occupation. """
+        t = self.tableau
+        t.xs[i] = x
+        t.ys[i] = y
+        self.places.append(i)
+        if self.occupation is not None:
+            self.occupation.occuper(x, y, t.largeurs[i], t.hauteurs[i])
+
+    def _enlever(self, i):
+        """ Retire le dernier rectangle placé, numéro i (backtracking), et libère sa zone dans l'index d'occupation. """
+        self.places.pop()
+        if self.occupation is not None:
+            t = self.tableau
+            self.occupation.liberer(t.xs[i], t.ys[i], t.largeurs[i], t.hauteurs[i])
+
+    def _rejoue_placements(self, rects, placements):
+        """ Charge rects puis rejoue les placements (numéro dans rects, x, y) calculés ailleurs (processus fils), dans
+        l'ordre, et recopie les positions dans les objets Rectangle. """
+        self._charge(rects)
+        for i, x, y in placements:
+            self._placer(i, x, y)
+        self._ecrit_positions()
+
+    def _ecrit_positions(self):
+        """ Recopie les positions des rectangles placés dans les objets Rectangle de l'appelant. """
+        self.rectangles_places = self.tableau.ecrit_positions(self.places)
+
+    def valide(self, max_paires=100):
+        """ Valide en O(n log n) le placement de la dernière résolution (tous les rectangles placés, dans le conteneur,
+        sans chevauchement, et couverture exacte si EMBALLAGE_PARFAIT). Retourne un RapportValidation. """
+        return valide_placement(self.tableau.rectangles, self.largeur_conteneur, self.hauteur_conteneur,
+                                self.EMBALLAGE_PARFAIT, max_paires)
+
     def hauteur_max(self):
         """ Retourne la hauteur maximale utilisée. """
         if not self.rectangles_places:
@@ -1,12 +1,120 @@
 """ Implémentation de l'algorithme Bottom-Left. """
 
+import random
+import time
+from bisect import insort
+
+from models.rectangle import Rectangle
 from solvers.base import SolveurBase
 
+# Ordres de tri déterministes : poids trié par ordre décroissant ("croissant" : aire croissante)
+POIDS_ORDRES = {
+    "decroissant": lambda r: r.largeur * r.hauteur,
+    "largeur": lambda r: r.largeur,
+    "hauteur": lambda r: r.hauteur,
+    "perimetre": lambda r: r.largeur + r.hauteur,
+    "cote_max": lambda r: max(r.largeur, r.hauteur),
+}
+ORDRES = ("decroissant", "croissant", "largeur", "hauteur", "perimetre", "cote_max")
+AMPLITUDE_PERTURBATION = 0.25  # les poids des ordres aléatoires sont multipliés par un facteur de [0.75, 1.25]
+TAILLE_LOT = 8  # ordres évalués par tâche d'un processus
+
+
+def ordonne(rectangles, ordre):
+    """ Retourne une copie de rectangles triée selon ordre (ORDRES ; tout autre ordre, "aucun" par exemple, garde
+    l'ordre donné). Tri stable : les rectangles de même poids gardent leur ordre. """
+    rects = list(rectangles)
+    if ordre == "croissant":
+        rects.sort(key=lambda r: r.aire())
+    elif ordre in POIDS_ORDRES:
+        rects.sort(key=POIDS_ORDRES[ordre], reverse=True)
+    return rects
+
+
+def _essaie_ordres_tache(tache):
+    return _essaie_ordres(*tache)
+
+
+def _essaie_ordres(largeur, hauteur, moteur, dimensions, permutations, premier):
+    """ Tâche exécutée dans un processus fils (ou en ligne) : emballe les rectangles de dimensions données dans
+    chaque ordre (numéro, permutation des indices) de permutations. Retourne (numéro, hauteur utilisée) du premier
+    succès si premier, sinon du succès de hauteur minimale, ou (None, None). """
+    solveur = BottomLeft(largeur, hauteur, moteur)
+    rects = [Rectangle(w, h, i) for i, (w, h) in enumerate(dimensions)]
+    meilleur = (None, None)
+    for numero, permutation in permutations:
+        if not solveur.emballe([rects[i] for i in permutation], ordre="aucun"):
+            continue
+        hauteur_utilisee = solveur.hauteur_max()
+        if premier:
+            return numero, hauteur_utilisee
+        if meilleur[1] is None or hauteur_utilisee < meilleur[1]:
+            meilleur = (numero, hauteur_utilisee)
+    return meilleur
+
 
 class BottomLeft(SolveurBase):
     """ Prend un conteneur de dimensions fixes et tente d'y placer une liste de rectangles sans chevauchement.
     L'algorithme parcourt chaque rectangle et le positionne à la première position valide trouvée en balayant l'espace
-    de bas en haut, puis de gauche à droite. """
+    de bas en haut, puis de gauche à droite.
+    Trois moteurs donnent exactement les mêmes placements :
+        - "candidats" : ne teste que les ordonnées candidates (0 et bords hauts des rectangles placés) et demande à
+                        l'index d'occupation la première abscisse libre, soit O(n) sondages par placement,
+                        indépendamment de l'aire du conteneur (par défaut).
+        - "balayage"  : teste chaque point entier (x, y) du conteneur, en O(W×H) sondages par placement.
+        - "numpy"     : matrice d'occupation et table des sommes cumulées (summed-area table) ; toutes les positions
+                        sont testées en une passe vectorisée (Numpy, importé seulement pour ce moteur).
+    Un échec dépend de l'ordre des rectangles : avec essais > 1, emballe essaie plusieurs ordres (l'ordre demandé,
+    puis les autres ORDRES, puis des perturbations aléatoires reproductibles de ceux-ci, de graine graine), par lots
+    sur nb_processus processus et dans la limite de budget_temps secondes. critere : "premier" retient le premier
+    succès (dans l'ordre des essais), "hauteur" le succès de plus faible hauteur utilisée parmi tous les essais. """
+
+    MOTEURS = ("candidats", "balayage", "numpy")
+    CRITERES = ("premier", "hauteur")
+    REGLES_CHRONOMETREES = {"position_candidats": "trouve_bottom_left_candidats",
+                            "position_balayage": "trouve_bottom_left", "position_numpy": "trouve_bottom_left_numpy"}
+
+    def __init__(self, largeur, hauteur, moteur="candidats", essais=1, critere="premier", budget_temps=None,
+                 nb_processus=1, graine=0):
+        super().__init__(largeur, hauteur)
+        if moteur not in self.MOTEURS:
+            raise ValueError(f"Moteur Bottom-Left inconnu : {moteur!r} (attendu : {', '.join(self.MOTEURS)})")
+        if critere not in self.CRITERES:
+            raise ValueError(f"Critère inconnu : {critere!r} (attendu : {', '.join(self.CRITERES)})")
+        self.moteur = moteur
+        self.essais = essais
+        self.critere = critere
+        self.budget_temps = budget_temps
+        self.nb_processus = nb_processus
+        self.graine = graine
+        self.ordre_retenu = None  # essais > 1 : ordre du placement retenu (nom, ou "nom~k" pour une perturbation)
+        self._ordonnees = [0]  # ordonnées candidates triées : 0 et bords hauts des rectangles placés
+        # Moteur "numpy" : grille[y, x] = 1 si la cellule est occupée, et sa table des sommes cumulées (None si elle
+        # est à recalculer)
+        self._grille = None
+        self._sommes = None
+
+    @classmethod
+    def lance_processus(cls, parametres):
+        """ Les ordres ne sont évalués sur un pool de processus qu'avec essais > 1 et nb_processus > 1. """
+        return parametres.get("essais", 1) > 1 and parametres.get("nb_processus", 1) > 1
+
+    def _reinitialise_placements(self):
+        super()._reinitialise_placements()
+        self._ordonnees = [0]
+        if self.moteur == "numpy":
+            import numpy as np
+            self._grille = np.zeros((self.hauteur_conteneur, self.largeur_conteneur), dtype=np.uint8)
+            self._sommes = None
+
+    def _placer(self, i, x, y):
+        super()._placer(i, x, y)
+        haut = y + self.tableau.hauteurs[i]
+        if haut not in self._ordonnees:
+            insort(self._ordonnees, haut)
+        if self._grille is not None:
+            self._grille[y:haut, x:x + self.tableau.largeurs[i]] = 1
+            self._sommes = None
 
     def trouve_bottom_left(self, rect):
         """ Trouve la position Bottom-Left pour placer un rectangle.
@@ -14,27 +122,164 @@ class BottomLeft(SolveurBase):
         for y in range(self.hauteur_conteneur):
             for x in range(self.largeur_conteneur):
                 if self.peut_etre_place(rect, x, y):
+                    self.stats.compte("sondages", y * self.largeur_conteneur + x + 1)
                     return x, y
+        self.stats.compte("sondages", self.hauteur_conteneur * self.largeur_conteneur)
         return None
 
+    def trouve_bottom_left_candidats(self, rect):
+        """ Trouve la même position que trouve_bottom_left sans balayer le conteneur. La position valide la plus basse
+        a y = 0 ou repose sur le bord haut d'un rectangle placé (sinon elle pourrait descendre d'une unité) : on ne
+        teste que ces ordonnées, de bas en haut, et l'index d'occupation fournit la première abscisse libre.
+        Retourne un tuple (x, y) de la position ou None si aucune position n'est trouvée. """
+        limite_y = self.hauteur_conteneur - rect.hauteur
+        sondages = 0
+        for y in self._ordonnees:
+            if y > limite_y:
+                break
+            sondages += 1
+            x = self.occupation.premier_x_libre(y, rect.largeur, rect.hauteur)
+            if x is not None:
+                self.stats.compte("sondages", sondages)
+                return x, y
+        self.stats.compte("sondages", sondages)
+        return None
+
+    def trouve_bottom_left_numpy(self, rect):
+        """ Trouve la même position que trouve_bottom_left en une passe vectorisée. La table des sommes cumulées S
+        (S[y, x] = cellules occupées de [0, x[ × [0, y[) donne le nombre de cellules occupées de chaque fenêtre w×h
+        par quatre lectures ; les fenêtres vides forment le masque des positions valides, dont la première dans
+        l'ordre des rangées est la plus basse, puis la plus à gauche.
+        Retourne un tuple (x, y) de la position ou None si aucune position n'est trouvée. """
+        import numpy as np
+
+        w, h = rect.largeur, rect.hauteur
+        largeur, hauteur = self.largeur_conteneur, self.hauteur_conteneur
+        if w > largeur or h > hauteur:
+            return None
+        if self._sommes is None:
+            self._sommes = np.zeros((hauteur + 1, largeur + 1), dtype=np.int32)
+            np.cumsum(np.cumsum(self._grille, axis=0, dtype=np.int32), axis=1, out=self._sommes[1:, 1:])
+        sommes = self._sommes
+
+        # occupees[y, x] : cellules occupées de la fenêtre [x, x+w[ × [y, y+h[
+        occupees = (sommes[h:, w:] - sommes[:hauteur - h + 1, w:] - sommes[h:, :largeur - w + 1] +
+                    sommes[:hauteur - h + 1, :largeur - w + 1])
+        libres = occupees == 0
+        self.stats.compte("sondages", libres.size)
+        k = int(libres.argmax())
+        if not libres.flat[k]:
+            return None
+        y, x = divmod(k, largeur - w + 1)
+        return x, y
+
     def emballe(self, rectangles, ordre="decroissant"):
-        """ Emballe les rectangles en utilisant l'algorithme Bottom-Left.
+        """ Emballe les rectangles en utilisant l'algorithme Bottom-Left, dans l'ordre donné (voir ordonne) ou, si
+        essais > 1, dans le meilleur des ordres essayés.
         Retourne True si tous les rectangles ont été placés, False sinon. """
-        self.rectangles_places = []
-        for rectangle in rectangles: rectangle.reset_position()
+        if self.essais > 1:
+            return self._emballe_multi(rectangles, ordre)
+        return self._emballe_ordonne(ordonne(rectangles, ordre))
+
+    def _ordres_essais(self, rectangles, ordre):
+        """ Retourne les essais (nom, permutation des indices de rectangles) : l'ordre demandé, les autres ORDRES, puis
+        des perturbations aléatoires des poids des ordres décroissants, jusqu'à self.essais ordres distincts. """
+        indices = {id(r): i for i, r in enumerate(rectangles)}
+        essais = []
+        vues = set()
+        for nom in [ordre] + [o for o in ORDRES if o != ordre]:
+            permutation = tuple(indices[id(r)] for r in ordonne(rectangles, nom))
+            if permutation not in vues:
+                vues.add(permutation)
+                essais.append((nom, permutation))
+
+        rng = random.Random(self.graine)
+        noms = list(POIDS_ORDRES)
+        tentatives = 0
+        while len(essais) < self.essais and tentatives < 4 * self.essais:  # peu d'ordres distincts si n est petit
+            tentatives += 1
+            nom = noms[tentatives % len(noms)]
+            poids = POIDS_ORDRES[nom]
+            bruit = [poids(r) * rng.uniform(1 - AMPLITUDE_PERTURBATION, 1 + AMPLITUDE_PERTURBATION) for r in rectangles]
+            permutation = tuple(sorted(range(len(rectangles)), key=lambda i: -bruit[i]))
+            if permutation not in vues:
+                vues.add(permutation)
+                essais.append((f"{nom}~{tentatives}", permutation))
+        return essais[:self.essais]
+
+    def _emballe_multi(self, rectangles, ordre):
+        """ Évalue les ordres de _ordres_essais par lots de TAILLE_LOT (en ligne ou sur un pool de processus) jusqu'au
+        critère ou au budget de temps, puis rejoue l'ordre retenu (le premier essai si aucun ne réussit). """
+        debut = time.perf_counter()
+        limite = None if self.budget_temps is None else debut + self.budget_temps
+        essais = self._ordres_essais(rectangles, ordre)
+        dimensions = [(r.largeur, r.hauteur) for r in rectangles]
+        premier = self.critere == "premier"
+        lots = [[(k, essais[k][1]) for k in range(debut_lot, min(debut_lot + TAILLE_LOT, len(essais)))]
+                for debut_lot in range(0, len(essais), TAILLE_LOT)]
+        taches = [(self.largeur_conteneur, self.hauteur_conteneur, self.moteur, dimensions, lot, premier)
+                  for lot in lots]
+
+        meilleur = (None, None)
+        evalues = 0
+        if self.nb_processus > 1 and len(lots) > 1:
+            import multiprocessing  # importé seulement pour l'évaluation parallèle (démarrage plus rapide)
+            with multiprocessing.get_context().Pool(self.nb_processus) as pool:
+                resultats = pool.imap(_essaie_ordres_tache, taches)  # dans l'ordre des lots : résultat reproductible
+                for lot in lots:
+                    try:
+                        resultat = resultats.next(None if limite is None else max(0.0, limite - time.perf_counter()))
+                    except multiprocessing.TimeoutError:
+                        break
+                    evalues += len(lot)
+                    meilleur = self._meilleur_essai(meilleur, resultat)
+                    if premier and meilleur[0] is not None:
+                        break
+        else:
+            for tache in taches:
+                if limite is not None and time.perf_counter() >= limite:
+                    break
+                evalues += len(tache[4])
+                meilleur = self._meilleur_essai(meilleur, _essaie_ordres(*tache))
+                if premier and meilleur[0] is not None:
+                    break
+
+        nom, permutation = essais[0 if meilleur[0] is None else meilleur[0]]
+        self.ordre_retenu = nom
+        succes = self._emballe_ordonne([rectangles[i] for i in permutation])
+        self.stats.compte("ordres_essayes", evalues)
+        self.stats.duree_s = time.perf_counter() - debut
+        return succes
 
-        rects_a_placer = rectangles.copy()
+    @staticmethod
+    def _meilleur_essai(meilleur, resultat):
+        """ Retient le meilleur des deux résultats (numéro, hauteur) : hauteur minimale, puis premier essai. """
+        if resultat[0] is None:
+            return meilleur
+        if meilleur[0] is None or (resultat[1], resultat[0]) < (meilleur[1], meilleur[0]):
+            return resultat
+        return meilleur
 
-        if ordre == "decroissant":
-            rects_a_placer.sort(key=lambda r: r.aire(), reverse=True)
-        elif ordre == "croissant":
-            rects_a_placer.sort(key=lambda r: r.aire())
+    def _emballe_ordonne(self, rects_a_placer):
+        """ Emballe les rectangles dans l'ordre de la liste rects_a_placer. """
+        self._charge(rects_a_placer)
+        trouve_position = {"candidats": self.trouve_bottom_left_candidats, "balayage": self.trouve_bottom_left,
+                           "numpy": self.trouve_bottom_left_numpy}[self.moteur]
+        stats = self.stats
+        stats.reinitialise()
+        debut = time.perf_counter()
 
-        for rect in rects_a_placer:
-            position = self.trouve_bottom_left(rect)
+        succes = True
+        for i, rect in enumerate(rects_a_placer):
+            stats.noeuds += 1  # un nœud = un rectangle traité
+            if stats.noeuds >= stats.prochain_rappel:
+                stats.signale()
+            position = trouve_position(rect)
             if position is None:
-                return False
-            rect.x, rect.y = position
-            self.rectangles_places.append(rect)
+                succes = False
+                break
+            self._placer(i, *position)
 
-        return True
+        stats.duree_s = time.perf_counter() - debut
+        self._ecrit_positions()
+        return succes
@@ -1,227 +1,317 @@
 """ Implémentation du DFS avec backtracking optimisé. """
 
-from solvers.base import SolveurBase
+from solvers.recherche import SolveurArborescent
+from utils.bornes import borne_martello_toth, decale_capacites
+from utils.transposition import EmpreinteRegion, TableTransposition
 
-class DFS(SolveurBase):
+class DFS(SolveurArborescent):
     """ Résout le Rectangle Packing par une recherche en profondeur avec backtracking.
     Améliorations implémentées :
         1. Brisure de symétrie    : force le premier rectangle dans le quadrant inférieur gauche.
         2. Élagage par aire       : coupe si l'aire restante dépasse l'espace libre.
         3. Bounding functions     : relaxation 1D de Korf (horizontale + verticale) via algo Martello & Toth.
-        4. Incrémentalisme        : mise à jour de l'état du conteneur (évitent de re-calculer l'état global). """
-
-    def __init__(self, largeur, hauteur):
+        4. Incrémentalisme        : mise à jour de l'état du conteneur (évitent de re-calculer l'état global), y compris
+                                    les histogrammes bins/items des bounding functions.
+        5. Nogoods                : mémorise les états (région occupée, index du prochain rectangle) déjà réfutés,
+                                    atteints de nouveau par un autre agencement des mêmes rectangles.
+        6. Rectangles identiques  : les rectangles de mêmes dimensions sont interchangeables ; chacun est posé après
+                                    le précédent de son groupe dans l'ordre de balayage (ordre lexicographique).
+        7. Positions dominées     : un rectangle qui pourrait glisser vers la gauche (ou le bas) dans un espace
+                                    qu'aucun rectangle restant ne peut occuper n'est pas posé là : la position
+                                    glissée donne les mêmes sous-arbres.
+    La recherche est itérative (pile explicite, voir SolveurArborescent) : elle accepte un budget de nœuds / de temps
+    et peut être sauvegardée puis reprise. """
+
+    REGLES_CHRONOMETREES = {"bounding_function": "_bounding_function", "generation_positions": "_position_libre"}
+    CACHES = ("nogoods",)
+    ECHEC_PROUVE = True
+    PROFONDEUR_DECOUPE = 2  # sous-problèmes parallèles : positions (hors symétrie) des deux premiers rectangles
+
+    def __init__(self, largeur, hauteur, taille_nogoods=200_000):
         super().__init__(largeur, hauteur)
-        self.noeuds_explores = 0
-        self.noeuds_elagages_aire = 0
-        self.noeuds_elagages_sym = 0
-        self.noeuds_elagages_bf = 0
+
+        # Nogoods : empreinte de la région occupée + table bornée des états réfutés (0 => désactivée)
+        self.taille_nogoods = taille_nogoods
+        self.region = EmpreinteRegion(largeur, hauteur)
+        self.nogoods = TableTransposition(taille_nogoods)
 
         self.aire_libre_courante = largeur * hauteur
         self.capacites_h = [largeur] * hauteur
         self.capacites_v = [hauteur] * largeur
+        self._initialise_histogrammes([], [])
+        self._initialise_groupes()
 
 
     # 1. Vérification / Génération de positions
     def _meilleur_bloquant(self, x, y, w, h):
         """ Retourne la coordonnée x de fin du meilleur bloqueur, ou None. Au lieu de s'arrêter au premier rectangle qui
-        chevauche, on cherche celui qui s'étend le plus loin vers la droite pour maximiser notre saut. """
-        meilleur_saut = -1
-        for place in self.rectangles_places:
-            # Condition de chevauchement sur X : les intervalles [x, x+w[ et [place.x, place.x+largeur[ se croisent
-            if (x < place.x + place.largeur and x + w > place.x and
-            # Condition de chevauchement sur Y : les intervalles [y, y+h[ et [place.y, place.y+hauteur[ se croisent
-                y < place.y + place.hauteur and y + h > place.y):
-                if place.x + place.largeur > meilleur_saut:
-                    meilleur_saut = place.x + place.largeur
-        return meilleur_saut if meilleur_saut != -1 else None
-
-    def _positions_candidates_generateur(self, rect):
-        """ Génère les positions candidates à la volée (yield) pour économiser la mémoire. """
-        limite_x = self.largeur_conteneur - rect.largeur
-        limite_y = self.hauteur_conteneur - rect.hauteur
-
-        # Élagage par brisure de symétrie
-        if not self.rectangles_places:  # uniquement pour le 1er rectangle
-            limite_x_sym = limite_x // 2  # moitié gauche seulement
-            limite_y_sym = limite_y // 2  # moitié basse seulement
-
-            # Calcul du nombre de positions ignorées par la symétrie (pour stats)
-            coupes_x = (limite_x - limite_x_sym) * (limite_y + 1)
-            coupes_y = (limite_y - limite_y_sym) * (limite_x_sym + 1)
-            self.noeuds_elagages_sym += (coupes_x + coupes_y)
-
-            limite_x = limite_x_sym
-            limite_y = limite_y_sym
-
-        for y in range(limite_y + 1):
-            x = 0
+        chevauche, on cherche celui qui s'étend le plus loin vers la droite pour maximiser notre saut. La réponse est
+        fournie par l'index d'occupation, sans parcourir les rectangles placés. """
+        return self.occupation.fin_bloquant(x, y, w, h)
+
+    def _position_libre(self, w, h, x, y, limite_x, limite_y):
+        """ Retourne la première position libre (x', y') pour un rectangle w×h à partir de (x, y) dans l'ordre de
+        balayage (ligne par ligne, puis de gauche à droite), sans dépasser (limite_x, limite_y), ou None. Le balayage
+        peut ainsi être repris après la dernière position proposée : c'est le curseur d'un cadre de la pile. """
+        meilleur_bloquant = self.occupation.fin_bloquant  # appel direct à l'index (boucle chaude)
+        while y <= limite_y:
             while x <= limite_x:
-                saut = self._meilleur_bloquant(x, y, rect.largeur, rect.hauteur)
+                saut = meilleur_bloquant(x, y, w, h)
                 if saut is None:
-                    yield x, y  # position libre proposée
-                    x += 1
-                else:
-                    # Saut maximal : on avance x directement à la fin du plus grand bloqueur
-                    x = saut
+                    return x, y  # position libre proposée
+                # Saut maximal : on avance x directement à la fin du plus grand bloqueur
+                x = saut
+            y += 1
+            x = 0
+        return None
+
+    def _position_dominee(self, index, x, y, w, h):
+        """ Retourne True si le rectangle index, posé en (x, y), peut glisser d'une case vers la gauche (resp. le bas)
+        sans que la colonne (resp. rangée) libérée ne puisse servir : dans chacune de ses rangées, l'espace libre à sa
+        gauche est plus étroit que tous les rectangles restants (resp. plus bas que tous). Toute solution avec cette
+        position reste une solution après glissement ; on ne garde que les positions qui ne glissent pas. """
+        # Un espace libre d'une case peut toujours servir si un rectangle restant est large (ou haut) d'une case
+        occupation = self.occupation
+        largeur_min = self.largeur_min_suivants[index]
+        if largeur_min > 1 and x > 0 and occupation.est_libre(x - 1, y, 1, h):
+            if x < largeur_min or not any(occupation.est_libre(x - largeur_min, r, largeur_min, 1)
+                                          for r in range(y, y + h)):
+                return True
+        hauteur_min = self.hauteur_min_suivants[index]
+        if hauteur_min > 1 and y > 0 and occupation.est_libre(x, y - 1, w, 1):
+            if y < hauteur_min or not any(occupation.est_libre(c, y - hauteur_min, 1, hauteur_min)
+                                          for c in range(x, x + w)):
+                return True
+        return False
 
 
     # 2. Gestion de l'état incrémental
-    def _placer(self, rect, x, y):
-        """ Place le rectangle et met à jour les états incrémentaux du conteneur. États lus par les bounding functions
-        sans re-calcul. """
-        rect.x = x
-        rect.y = y
-        self.rectangles_places.append(rect)
-        self.aire_libre_courante -= rect.aire()  # soustrait l'aire du rectangle de l'espace libre global
+    def _initialise_histogrammes(self, largeurs, hauteurs):
+        """ Initialise les histogrammes lus par les bounding functions, indexés par taille (tableaux d'entiers) :
+            - bins_h[c] / bins_v[c]   : nombre de rangées / colonnes de capacité libre c
+            - items_h[t] / items_v[t] : aire des rectangles non placés de largeur / hauteur t
+        Les masques ont le bit t à 1 si la taille t est présente, pour ne parcourir que les tailles distinctes. """
+        taille_h = max([self.largeur_conteneur] + largeurs) + 1
+        taille_v = max([self.hauteur_conteneur] + hauteurs) + 1
+
+        self.bins_h = [0] * taille_h
+        self.bins_h[self.largeur_conteneur] = self.hauteur_conteneur
+        self.bins_v = [0] * taille_v
+        self.bins_v[self.hauteur_conteneur] = self.largeur_conteneur
+        self.masque_bins_h = 1 << self.largeur_conteneur
+        self.masque_bins_v = 1 << self.hauteur_conteneur
+
+        self.items_h = [0] * taille_h
+        self.items_v = [0] * taille_v
+        for w, h in zip(largeurs, hauteurs):
+            # Un rect de largeur L et hauteur H génère H tranches de largeur L (horizontal), L tranches de hauteur H
+            self.items_h[w] += w * h
+            self.items_v[h] += w * h
+        self.masque_items_h = sum(1 << t for t in range(taille_h) if self.items_h[t])
+        self.masque_items_v = sum(1 << t for t in range(taille_v) if self.items_v[t])
+
+    def _initialise_groupes(self):
+        """ Prépare la brisure de symétrie des rectangles identiques et le test des positions dominées :
+            - jumeau_precedent[i]     : numéro du rectangle précédent de mêmes dimensions que i, ou -1
+            - jumeaux_ouverts[i]      : pour chaque groupe dont des rectangles sont placés et d'autres non quand le
+                                        prochain est i, numéro du dernier placé (sa position contraint la suite)
+            - largeur_min_suivants[i] : plus petite largeur (resp. hauteur) des rectangles de numéro > i """
+        t = self.tableau
+        n = len(t)
+        groupes = {}
+        for i, dimensions in enumerate(zip(t.largeurs, t.hauteurs)):
+            groupes.setdefault(dimensions, []).append(i)
+        self.jumeau_precedent = [-1] * n
+        self.jumeaux_ouverts = [[] for _ in range(n + 1)]
+        for membres in groupes.values():
+            for precedent, suivant in zip(membres, membres[1:]):
+                self.jumeau_precedent[suivant] = precedent
+                for i in range(precedent + 1, suivant + 1):
+                    self.jumeaux_ouverts[i].append(precedent)
+
+        self.largeur_min_suivants = [self.largeur_conteneur + 1] * n
+        self.hauteur_min_suivants = [self.hauteur_conteneur + 1] * n
+        for i in range(n - 2, -1, -1):
+            self.largeur_min_suivants[i] = min(self.largeur_min_suivants[i + 1], t.largeurs[i + 1])
+            self.hauteur_min_suivants[i] = min(self.hauteur_min_suivants[i + 1], t.hauteurs[i + 1])
+
+    def _placer(self, i, x, y):
+        """ Place le rectangle numéro i et met à jour les états incrémentaux du conteneur. États lus par les bounding
+        functions sans re-calcul. """
+        super()._placer(i, x, y)
+        w, h = self.tableau.largeurs[i], self.tableau.hauteurs[i]
+        self.aire_libre_courante -= w * h  # soustrait l'aire du rectangle de l'espace libre global
+        self.region.ajoute(x, y, w, h)
 
         # Pour chaque rangée y (puis x) que le rectangle occupe (de y à y+hauteur/de x à x+largeur),
-        # on réduit la capacité horizontale/verticale disponible de sa largeur/hauteur.
-        for cy in range(y, y + rect.hauteur):
-            self.capacites_h[cy] -= rect.largeur
-        for cx in range(x, x + rect.largeur):
-            self.capacites_v[cx] -= rect.hauteur
-
-    def _enlever(self, rect):
-        """ Retire le rectangle et restaure les états incrémentaux. Appelée lors du backtracking. """
-        self.rectangles_places.pop()
-        self.aire_libre_courante += rect.aire()  # restitue l'aire à l'espace libre global
+        # on réduit la capacité horizontale/verticale disponible de sa largeur/hauteur, et on déplace la rangée
+        # dans l'histogramme des bins.
+        self.masque_bins_h = decale_capacites(self.capacites_h, self.bins_h, self.masque_bins_h, y, y + h, -w)
+        self.masque_bins_v = decale_capacites(self.capacites_v, self.bins_v, self.masque_bins_v, x, x + w, -h)
+
+        # Le rectangle quitte les items non placés
+        self.items_h[w] -= w * h
+        if not self.items_h[w]:
+            self.masque_items_h &= ~(1 << w)
+        self.items_v[h] -= w * h
+        if not self.items_v[h]:
+            self.masque_items_v &= ~(1 << h)
+
+    def _enlever(self, i):
+        """ Retire le rectangle numéro i et restaure les états incrémentaux. Appelée lors du backtracking. """
+        t = self.tableau
+        x, y, w, h = t.xs[i], t.ys[i], t.largeurs[i], t.hauteurs[i]
+        self.aire_libre_courante += w * h  # restitue l'aire à l'espace libre global
+        self.region.retire(x, y, w, h)
 
         # Restaure la capacité horizontale/verticale de chaque rangée occupée
-        for cy in range(rect.y, rect.y + rect.hauteur):
-            self.capacites_h[cy] += rect.largeur
-        for cx in range(rect.x, rect.x + rect.largeur):
-            self.capacites_v[cx] += rect.hauteur
+        self.masque_bins_h = decale_capacites(self.capacites_h, self.bins_h, self.masque_bins_h, y, y + h, w)
+        self.masque_bins_v = decale_capacites(self.capacites_v, self.bins_v, self.masque_bins_v, x, x + w, h)
+
+        # Le rectangle redevient un item non placé
+        self.items_h[w] += w * h
+        self.masque_items_h |= 1 << w
+        self.items_v[h] += w * h
+        self.masque_items_v |= 1 << h
 
-        rect.reset_position()
+        super()._enlever(i)
 
 
     #  3. Bounding Functions de Korf (Martello & Toth)
-    @staticmethod
-    def _calcule_items(rects, index, orientation):
-        """ Construit le vecteur des items en utilisant l'index pour éviter la copie de liste. """
-        items = {}
-        # On parcourt uniquement de l'index courant jusqu'à la fin (rectangles non placés)
-        for i in range(index, len(rects)):
-            r = rects[i]
-            if orientation == 'horizontale':
-                # Un rect de largeur L et hauteur H génère H tranches de largeur L
-                taille, nb = r.largeur, r.hauteur
-            else:
-                # Un rect de largeur L et hauteur H génère L tranches de hauteur H
-                taille, nb = r.hauteur, r.largeur
-            items[taille] = items.get(taille, 0) + taille * nb
-        return items
-
-    @staticmethod
-    def _borne_martello_toth(capacites, items, taille_max):
-        """ Calcule une borne inférieure sur le gaspillage. """
-        bins = {}
-        for cap in capacites:
-            if cap > 0:
-                # bins[c] = aire totale disponible dans toutes les rangées de capacité libre c
-                bins[cap] = bins.get(cap, 0) + cap
-
-        gaspillage = 0
-        carryover = 0
-
-        for taille in range(1, taille_max + 1):
-            bin_area = bins.get(taille, 0)  # espace dans les bins de capacité exacte = taille
-            item_area = items.get(taille, 0)  # aire des items de taille exacte = taille
-            total_items = carryover + item_area
-
-            if bin_area > total_items:  # surplus de capacité
-                gaspillage += bin_area - total_items
-                carryover = 0
-            else:  # surplus d'items
-                carryover = total_items - bin_area
-
-        return gaspillage
-
-    def _bounding_function(self, rects, index, aire_restante):
-        """ Applique les bounding functions de Korf sans cloner de listes.
+    # Borne inférieure sur le gaspillage (voir utils/bornes.py)
+    _borne_martello_toth = staticmethod(borne_martello_toth)
+
+    def _bounding_function(self, aire_restante):
+        """ Applique les bounding functions de Korf à partir des histogrammes incrémentaux.
         Se lit tel que : m'espace disponible dans le conteneur (aire_libre_courante) doit pouvoir accueillir à la fois
         l'aire des rectangles restants (aire_restante) et l'espace qui sera forcément gaspillé (waste). Si ce n'est pas
         le cas, la solution est impossible."""
         # Direction horizontale : les bins sont les rangées, les items sont des tranches de largeur
-        items_h = self._calcule_items(rects, index, 'horizontale')
-        waste_h = self._borne_martello_toth(self.capacites_h, items_h, self.largeur_conteneur)
+        waste_h = self._borne_martello_toth(self.bins_h, self.items_h, self.masque_bins_h | self.masque_items_h)
         if aire_restante + waste_h > self.aire_libre_courante:
             return True  # élagage
 
         # Direction verticale : les bins sont les colonnes, les items sont des tranches de hauteur
-        items_v = self._calcule_items(rects, index, 'verticale')
-        waste_v = self._borne_martello_toth(self.capacites_v, items_v, self.hauteur_conteneur)
+        waste_v = self._borne_martello_toth(self.bins_v, self.items_v, self.masque_bins_v | self.masque_items_v)
         if aire_restante + waste_v > self.aire_libre_courante:
             return True  # élagage
 
         return False
 
-    # 4. DFS
-    def _dfs(self, rects, index, aire_restante):
-        """ Fonction récursive du DFS avec backtracking. """
-        self.noeuds_explores += 1
+    # 4. DFS (nœuds et branches pour le moteur itératif)
+    def _parametres(self):
+        return {"taille_nogoods": self.taille_nogoods}
+
+    def _initialise_recherche(self, rects):
+        """ Conteneur vide et histogrammes des rectangles rects (le rectangle numéro index est rects[index]). """
+        self._charge(rects)
+        self.region.reinitialiser()
+        self.nogoods = TableTransposition(self.taille_nogoods)
+
+        self.aire_libre_courante = self.largeur_conteneur * self.hauteur_conteneur
+        self.capacites_h = [self.largeur_conteneur] * self.hauteur_conteneur
+        self.capacites_v = [self.hauteur_conteneur] * self.largeur_conteneur
+        self.aire_totale = sum(self.tableau.aires)
+        self._initialise_histogrammes(self.tableau.largeurs, self.tableau.hauteurs)
+        self._initialise_groupes()
+
+    def _ouvre_noeud(self):
+        """ Évalue le nœud courant : le prochain rectangle à placer est le numéro index = nombre de rectangles
+        placés. Le cadre [index, x, y, limite_x, limite_y, place, empreinte] porte le curseur (x, y) à partir duquel
+        chercher la prochaine position, et place vaut True si le rectangle est posé (branche en cours). """
+        self.stats.noeuds += 1
+        index = len(self.places)
 
         # Cas de base
-        if index == len(rects):
+        if index == len(self.tableau):
             return True
 
         # Élagage par aire
+        aire_restante = self.aire_totale - (self.largeur_conteneur * self.hauteur_conteneur - self.aire_libre_courante)
         if aire_restante > self.aire_libre_courante:
-            self.noeuds_elagages_aire += 1
+            self.stats.elague("aire", index)
             return False
 
-        # Élagage par bounding function (on passe la liste complète et l'index actuel)
-        if self._bounding_function(rects, index, aire_restante):
-            self.noeuds_elagages_bf += 1
+        # Élagage par nogood : les rectangles restants sont les numéros index et suivants, et le sous-arbre ne dépend
+        # que de la région occupée (hors racine, soumise à la brisure de symétrie) et des positions qui contraignent
+        # les rectangles identiques restants
+        t = self.tableau
+        empreinte = None
+        if index > 0 and self.taille_nogoods:
+            empreinte = self.region.valeur() * (len(t) + 1) + index
+            aire_conteneur = self.largeur_conteneur * self.hauteur_conteneur
+            for j in self.jumeaux_ouverts[index]:
+                empreinte = empreinte * aire_conteneur + t.ys[j] * self.largeur_conteneur + t.xs[j]
+            if self.nogoods.contient(empreinte):
+                self.stats.elague("nogood", index)
+                return False
+
+        # Élagage par bounding function (histogrammes maintenus par _placer/_enlever)
+        if self._bounding_function(aire_restante):
+            self.stats.elague("bounding_function", index)
             return False
 
-        rect_courant = rects[index]
-        nouvelle_aire_restante = aire_restante - rect_courant.aire()
-
-        # Exploration via le générateur
-        for x, y in self._positions_candidates_generateur(rect_courant):
-            self._placer(rect_courant, x, y)
-            if self._dfs(rects, index + 1, nouvelle_aire_restante):
-                return True
-
-            self._enlever(rect_courant)
-
-        return False
-
-    #  5. Interface publique
-    def emballe(self, rectangles, ordre="decroissant"):
-        """ Emballe les rectangles en utilisant le DFS. """
-        self.rectangles_places = []
-        self.noeuds_explores = 0
-        self.noeuds_elagages_aire = 0
-        self.noeuds_elagages_sym = 0
-        self.noeuds_elagages_bf = 0
-
-        self.aire_libre_courante = self.largeur_conteneur * self.hauteur_conteneur
-        self.capacites_h = [self.largeur_conteneur] * self.hauteur_conteneur
-        self.capacites_v = [self.hauteur_conteneur] * self.largeur_conteneur
+        limite_x = self.largeur_conteneur - t.largeurs[index]
+        limite_y = self.hauteur_conteneur - t.hauteurs[index]
 
-        for rectangle in rectangles:
-            rectangle.reset_position()
-
-        rects_a_placer = rectangles.copy()
-
-        if ordre == "decroissant":
-            rects_a_placer.sort(key=lambda r: r.aire(), reverse=True)
-        elif ordre == "croissant":
-            rects_a_placer.sort(key=lambda r: r.aire())
+        # Élagage par brisure de symétrie
+        if index == 0:  # uniquement pour le 1er rectangle
+            # Moitié gauche seulement, sauf si des rectangles identiques le suivent : le plus bas du groupe (le 1er
+            # dans l'ordre lexicographique) peut être ramené dans la moitié basse par miroir, et le glissement des
+            # positions dominées ne le fait que descendre ; il peut en revanche le faire passer à droite
+            limite_x_sym = limite_x if 0 in self.jumeau_precedent else limite_x // 2
+            limite_y_sym = limite_y // 2  # moitié basse seulement
 
-        aire_totale = sum(r.aire() for r in rects_a_placer)
+            # Calcul du nombre de positions ignorées par la symétrie (pour stats : ce ne sont pas des nœuds élagués)
+            coupes_x = (limite_x - limite_x_sym) * (limite_y + 1)
+            coupes_y = (limite_y - limite_y_sym) * (limite_x_sym + 1)
+            self.stats.compte("positions_symetrie", coupes_x + coupes_y)
 
-        return self._dfs(rects_a_placer, 0, aire_totale)
+            limite_x = limite_x_sym
+            limite_y = limite_y_sym
 
+        # Rectangles identiques : on reprend le balayage juste après la position du précédent du groupe
+        jumeau = self.jumeau_precedent[index]
+        if jumeau >= 0:
+            return [index, t.xs[jumeau] + 1, t.ys[jumeau], limite_x, limite_y, False, empreinte]
+        return [index, 0, 0, limite_x, limite_y, False, empreinte]
+
+    def _branche_suivante(self, cadre):
+        """ Retire le rectangle du cadre s'il est posé, puis le pose à la position libre suivante. """
+        index, x, y, limite_x, limite_y, place, _ = cadre
+        if place:
+            self._enlever(index)
+            cadre[5] = False
+
+        w, h = self.tableau.largeurs[index], self.tableau.hauteurs[index]
+        dominance = self.largeur_min_suivants[index] > 1 or self.hauteur_min_suivants[index] > 1
+        while True:
+            position = self._position_libre(w, h, x, y, limite_x, limite_y)
+            if position is None:
+                return False
+            x, y = position
+            if not dominance or not self._position_dominee(index, x, y, w, h):
+                break
+            self.stats.compte("positions_dominees")
+            x += 1
+        cadre[1] = x + 1  # la prochaine recherche reprend juste après cette position
+        cadre[2] = y
+        cadre[5] = True
+        self._placer(index, x, y)
+        return True
+
+    def _rejoue(self, cadre):
+        if cadre[5]:
+            self._placer(cadre[0], cadre[1] - 1, cadre[2])
+
+    def _ferme_noeud(self, cadre):
+        if cadre[6] is not None:
+            self.nogoods.ajoute(cadre[6])
+
+    #  5. Interface publique (emballe / poursuit / sauvegarde / reprend : voir SolveurArborescent)
     def affiche_stats(self):
-        """ Affiche les statistiques de la recherche. (À débug/revoir)"""
-        total_elagages = self.noeuds_elagages_aire + self.noeuds_elagages_sym + self.noeuds_elagages_bf
-        print(f"        Noeuds explorés      : {self.noeuds_explores}")
-        print(f"        Élagages aire        : {self.noeuds_elagages_aire}")
-        print(f"        Élagages symétrie    : {self.noeuds_elagages_sym}")
-        print(f"        Élagages bounding f. : {self.noeuds_elagages_bf}")
-        if self.noeuds_explores > 0:
-            print(f"        Taux d'élagage      : {100 * total_elagages / self.noeuds_explores:.1f}%")
+        """ Affiche les statistiques de la recherche. Les positions écartées par la symétrie ne sont pas des nœuds
+        et ne comptent pas dans le taux d'élagage. """
+        self.stats.affiche()
+        if self.taille_nogoods:
+            self.nogoods.affiche_stats()
@@ -0,0 +1,214 @@
+""" DFS en deux phases (Huang & Korf) : abscisses de tous les rectangles d'abord, ordonnées ensuite. """
+
+from solvers.recherche import SolveurArborescent
+from utils.bornes import borne_martello_toth, decale_capacites
+
+# Type de cadre (premier élément d'un cadre de la pile)
+_PHASE_X = 0
+_PHASE_Y = 1
+# Choix d'un cadre de la phase y : laisser vide la case courante
+_GASPILLE = -1
+
+
+class DFSDeuxPhases(SolveurArborescent):
+    """ Résout le Rectangle Packing en séparant les deux dimensions (Huang & Korf, « Optimal rectangle packing: an
+    absolute placement approach ») :
+        Phase x : chaque rectangle reçoit une abscisse, sans ordonnée. Les rectangles qui couvrent une colonne ne
+                  doivent pas dépasser sa hauteur (capacites_v), et la relaxation 1D verticale de Korf (borne de
+                  Martello & Toth sur les colonnes) élague les affectations qui gaspillent trop d'espace. Brisure de
+                  symétrie : le premier rectangle reste dans la moitié gauche.
+        Phase y : les abscisses étant fixées, on remplit la case vide la plus basse (puis la plus à gauche) : soit
+                  un rectangle d'abscisse égale à sa colonne y pose son coin inférieur gauche, soit la case reste
+                  vide. Une colonne ne peut pas laisser vides plus de cases que sa capacité libre en fin de phase x.
+    L'arbre de la phase x est bien plus petit que celui de DFS (une seule coordonnée par rectangle), et la phase y
+    réussit ou échoue vite pour la plupart des affectations d'abscisses. Les deux phases forment un seul arbre pour le
+    moteur itératif (budgets, sauvegarde / reprise, recherche parallèle sur les abscisses des premiers rectangles). """
+
+    REGLES_CHRONOMETREES = {"bounding_function": "_bounding_function", "generation_abscisses": "_abscisse_libre",
+                            "phase_y": "_candidats_y"}
+    # Élagages (Statistiques) : bounding_function (phase x), colonne (phase y : ni rectangle ni case vide possible)
+    PROFONDEUR_DECOUPE = 2  # sous-problèmes parallèles : abscisses des deux premiers rectangles
+    ECHEC_PROUVE = True
+
+    # Les cases occupées sont connues par les hauteurs des colonnes (phase y) : pas d'index d'occupation
+    classe_occupation = None
+
+    def __init__(self, largeur, hauteur):
+        super().__init__(largeur, hauteur)
+        self._initialise_recherche([])
+
+    # Phase x : abscisses et capacités des colonnes
+    def _abscisse_libre(self, w, h, x, limite_x):
+        """ Retourne la première abscisse x' >= x (<= limite_x) où les colonnes x'..x'+w-1 ont toutes une capacité
+        libre d'au moins h, ou None. Une colonne trop pleine fait sauter toutes les abscisses qui la couvrent. """
+        capacites = self.capacites_v
+        while x <= limite_x:
+            for colonne in range(x + w - 1, x - 1, -1):
+                if capacites[colonne] < h:
+                    x = colonne + 1
+                    break
+            else:
+                return x
+        return None
+
+    def _place_x(self, i, x):
+        t = self.tableau
+        w, h = t.largeurs[i], t.hauteurs[i]
+        t.xs[i] = x
+        self.places_x.append(i)
+        self.aire_libre_courante -= w * h
+        self.masque_bins_v = decale_capacites(self.capacites_v, self.bins_v, self.masque_bins_v, x, x + w, -h)
+        self.items_v[h] -= w * h
+        if not self.items_v[h]:
+            self.masque_items_v &= ~(1 << h)
+
+    def _enleve_x(self, i):
+        t = self.tableau
+        x, w, h = t.xs[i], t.largeurs[i], t.hauteurs[i]
+        self.places_x.pop()
+        self.par_abscisse = None
+        self.aire_libre_courante += w * h
+        self.masque_bins_v = decale_capacites(self.capacites_v, self.bins_v, self.masque_bins_v, x, x + w, h)
+        self.items_v[h] += w * h
+        self.masque_items_v |= 1 << h
+
+    def _bounding_function(self, aire_restante):
+        """ Relaxation verticale de Korf : les colonnes sont des bins de capacité capacites_v, les rectangles non placés
+        des tranches de hauteur h (w tranches chacun). Retourne True si le gaspillage minimal ne laisse pas la place
+        aux rectangles restants. """
+        gaspillage = borne_martello_toth(self.bins_v, self.items_v, self.masque_bins_v | self.masque_items_v)
+        return aire_restante + gaspillage > self.aire_libre_courante
+
+    # Phase y : hauteurs des colonnes
+    def _candidats_y(self, colonne, y):
+        """ Retourne les choix pour la case (colonne, y), la plus basse puis la plus à gauche des cases vides : les
+        rectangles d'abscisse colonne non encore posés qui tiennent en (colonne, y) (toutes leurs colonnes remplies
+        jusqu'à y exactement, sommet sous le plafond), puis _GASPILLE si la colonne peut encore laisser une case
+        vide. """
+        t, hauts = self.tableau, self.hauts
+        if self.par_abscisse is None:  # entrée en phase y : rectangles regroupés par abscisse
+            self.par_abscisse = [[] for _ in range(self.largeur_conteneur)]
+            for i in range(len(t)):
+                self.par_abscisse[t.xs[i]].append(i)
+        candidats = []
+        for i in self.par_abscisse[colonne]:
+            if self.pose_y[i] or y + t.hauteurs[i] > self.hauteur_conteneur:
+                continue
+            if all(hauts[c] == y for c in range(colonne + 1, colonne + t.largeurs[i])):
+                candidats.append(i)
+        if self.cases_vides[colonne] < self.capacites_v[colonne]:
+            candidats.append(_GASPILLE)
+        return candidats
+
+    def _applique_y(self, colonne, y, choix):
+        if choix == _GASPILLE:
+            self.hauts[colonne] += 1
+            self.cases_vides[colonne] += 1
+            return
+        t = self.tableau
+        t.ys[choix] = y
+        self.pose_y[choix] = True
+        self.places.append(choix)
+        hauteur = y + t.hauteurs[choix]
+        for c in range(colonne, colonne + t.largeurs[choix]):
+            self.hauts[c] = hauteur
+
+    def _annule_y(self, colonne, y, choix):
+        if choix == _GASPILLE:
+            self.hauts[colonne] -= 1
+            self.cases_vides[colonne] -= 1
+            return
+        self.pose_y[choix] = False
+        self.places.pop()
+        for c in range(colonne, colonne + self.tableau.largeurs[choix]):
+            self.hauts[c] = y
+
+    # Nœuds et branches pour le moteur itératif
+    def _initialise_recherche(self, rects):
+        """ Conteneur vide, aucune abscisse fixée ; histogrammes verticaux des rectangles rects. """
+        self._charge(rects)
+        t = self.tableau
+        self.places_x = []
+        self.aire_libre_courante = self.largeur_conteneur * self.hauteur_conteneur
+        self.aire_totale = sum(t.aires)
+        self.capacites_v = [self.hauteur_conteneur] * self.largeur_conteneur
+
+        taille_v = max([self.hauteur_conteneur] + t.hauteurs) + 1
+        self.bins_v = [0] * taille_v
+        self.bins_v[self.hauteur_conteneur] = self.largeur_conteneur
+        self.masque_bins_v = 1 << self.hauteur_conteneur
+        self.items_v = [0] * taille_v
+        for w, h in zip(t.largeurs, t.hauteurs):
+            self.items_v[h] += w * h
+        self.masque_items_v = sum(1 << h for h in range(taille_v) if self.items_v[h])
+
+        # Phase y : hauteur remplie de chaque colonne, cases laissées vides par colonne, rectangles posés
+        self.hauts = [0] * self.largeur_conteneur
+        self.cases_vides = [0] * self.largeur_conteneur
+        self.pose_y = [False] * len(t)
+        self.par_abscisse = None  # rectangles par abscisse, calculé en entrant en phase y
+
+    def _ouvre_noeud(self):
+        """ Phase x tant que des rectangles n'ont pas d'abscisse : cadre [_PHASE_X, index, x, limite_x, place], où x
+        est l'abscisse à partir de laquelle chercher et place vaut True si le rectangle index a reçu l'abscisse x-1.
+        Phase y ensuite : cadre [_PHASE_Y, colonne, y, candidats, k, choix], choix étant le candidat appliqué (None
+        avant la première branche). """
+        self.stats.noeuds += 1
+        t = self.tableau
+        n = len(t)
+        index = len(self.places_x)
+
+        if index < n:
+            aire_restante = self.aire_totale - (self.largeur_conteneur * self.hauteur_conteneur -
+                                                self.aire_libre_courante)
+            if self._bounding_function(aire_restante):
+                self.stats.elague("bounding_function", index)
+                return False
+            limite_x = self.largeur_conteneur - t.largeurs[index]
+            if index == 0:  # brisure de symétrie (miroir gauche / droite)
+                limite_x //= 2
+            return [_PHASE_X, index, 0, limite_x, False]
+
+        if len(self.places) == n:
+            return True
+
+        hauts = self.hauts
+        y = min(hauts)
+        colonne = hauts.index(y)
+        candidats = self._candidats_y(colonne, y)
+        if not candidats:
+            self.stats.elague("colonne", n + len(self.places))
+            return False
+        return [_PHASE_Y, colonne, y, candidats, 0, None]
+
+    def _branche_suivante(self, cadre):
+        if cadre[0] == _PHASE_X:
+            _, index, x, limite_x, place = cadre
+            if place:
+                self._enleve_x(index)
+                cadre[4] = False
+            x = self._abscisse_libre(self.tableau.largeurs[index], self.tableau.hauteurs[index], x, limite_x)
+            if x is None:
+                return False
+            cadre[2] = x + 1
+            cadre[4] = True
+            self._place_x(index, x)
+            return True
+
+        _, colonne, y, candidats, k, choix = cadre
+        if choix is not None:
+            self._annule_y(colonne, y, choix)
+            cadre[5] = None
+        if k == len(candidats):
+            return False
+        cadre[4] = k + 1
+        cadre[5] = candidats[k]
+        self._applique_y(colonne, y, candidats[k])
+        return True
+
+    def _rejoue(self, cadre):
+        if cadre[0] == _PHASE_X:
+            if cadre[4]:
+                self._place_x(cadre[1], cadre[2] - 1)
+        elif cadre[5] is not None:
+            self._applique_y(cadre[1], cadre[2], cadre[5])
@@ -1,60 +1,75 @@
 """ DFS avec backtracking pour le Perfect Rectangle Packing. """
 
-from solvers.base import SolveurBase
+from solvers.recherche import SolveurArborescent
 from utils.skyline import Skyline
+from utils.rectangles_restants import IndexRestants
+from utils.transposition import TableTransposition
 
 
-class DFSSolverPRP(SolveurBase):
+class DFSSolverPRP(SolveurArborescent):
     """ Résout le Perfect Rectangle Packing par DFS avec backtracking et les règles de Hougardy:
             Règle 1 : Valley Area Check      — l'aire des rects compatibles doit couvrir la vallée
             Règle 2 : Brisure de symétrie    — le premier rect reste dans la moitié gauche
             Règle 3 : Propagation globale    — toutes les vallées doivent être couvrables
             Règle 4 : Dead space check       — l'espace résiduel de la vallée doit être couvert
-        Notons aussi les optimisations mémoire : zéro copie et zéro alloc. """
-
-    def __init__(self, largeur, hauteur):
+        Une table de transposition retient les états (profil de la skyline + multi-ensemble des rectangles restants)
+        déjà prouvés irréalisables, atteints de nouveau par un autre ordre de placement.
+        Notons aussi les optimisations mémoire : zéro copie et zéro alloc.
+        La recherche est itérative (pile explicite, voir SolveurArborescent) : elle accepte un budget de nœuds / de
+        temps et peut être sauvegardée puis reprise. """
+
+    REGLES_CHRONOMETREES = {"regle1_aire": "_regle1_valley_area_check", "regle2_symetrie": "_regle2_symetrie",
+                            "regle3_propagation": "_regle3_propagation_globale",
+                            "regle4_dead_space": "_regle4_dead_space", "generation_candidats": "_candidats"}
+    # Élagages (Statistiques) : vallee_vide (aucun rect compatible avec la vallée), regle1_aire (aire insuffisante),
+    # transposition (état déjà prouvé irréalisable), et sur les branches regle3_propagation (une autre vallée est
+    # insolvable) et regle4_dead_space (espace résiduel non couvert)
+    REGLES_BRANCHE = ("regle3_propagation", "regle4_dead_space")
+    CACHES = ("table",)
+    EMBALLAGE_PARFAIT = True
+    PROFONDEUR_DECOUPE = 1  # sous-problèmes parallèles : candidats de la première vallée
+
+    # La skyline tient lieu d'index d'occupation : les placements ne passent pas par SolveurBase._placer
+    classe_occupation = None
+
+    def __init__(self, largeur, hauteur, taille_table=200_000):
         super().__init__(largeur, hauteur)
         self.skyline = Skyline(largeur, hauteur)
-        self.noeuds_explores        = 0
-        self.elagages_vallee_vide   = 0   # aucun rect compatible avec la vallée
-        self.elagages_aire          = 0   # règle 1 : aire insuffisante
-        self.elagages_propagation   = 0   # règle 3 : une autre vallée est insolvable
-        self.elagages_dead_space    = 0   # règle 4 : espace résiduel non couvert
+        self.restants = IndexRestants([], [])
+        self.taille_table = taille_table  # nombre max d'états irréalisables retenus (0 => table désactivée)
+        self.table = TableTransposition(taille_table)
 
 
-    def _placer(self, rect, x, y):
-        rect.x = x
-        rect.y = y
-        self.rectangles_places.append(rect)
-        self.skyline.mettre_a_jour(rect)
+    def _placer(self, i, x, y):
+        t = self.tableau
+        t.xs[i] = x
+        t.ys[i] = y
+        self.places.append(i)
+        self.skyline.mettre_a_jour(x, y, t.largeurs[i], t.hauteurs[i])
 
-    def _enlever(self, rect):
-        self.rectangles_places.pop()
+    def _enlever(self, i):
+        self.places.pop()
         self.skyline.annuler()
-        rect.reset_position()
 
-    # Règles de pruning de Hougardy
-    def _regle1_valley_area_check(self, vallee, rects, n):
+    # Règles de pruning de Hougardy (requêtes sur l'index des rectangles non placés, sans parcours linéaire)
+    def _regle1_valley_area_check(self, vallee):
         """ L'aire totale des rects non placés compatibles avec la vallée doit être >= aire minimale de la vallée
         (largeur × hauteur_jusqu'au_plafond). Si l'aire est insuffisante, la vallée ne pourra jamais être remplie. """
         h_plafond   = self.skyline.hauteur_plafond(vallee)
         aire_vallee = vallee.largeur * (h_plafond - vallee.hauteur)
 
         hauteur_dispo = self.hauteur_conteneur - vallee.hauteur
-        aire_compatible = sum(
-            rects[i].aire()
-            for i in range(n)
-            if rects[i].largeur <= vallee.largeur and rects[i].hauteur <= hauteur_dispo
-        )
+        aire_compatible = self.restants.aire_compatible(vallee.largeur, hauteur_dispo)
         return aire_compatible >= aire_vallee
 
-    def _regle2_symetrie(self, rect, x_v, premier_placement):
-        """ Pour le tout premier rectangle placé, on le contraint dans la moitié gauche du conteneur. """
+    def _regle2_symetrie(self, largeur, x_v, premier_placement):
+        """ Pour le tout premier rectangle placé (de largeur largeur), on le contraint dans la moitié gauche du
+        conteneur. """
         if not premier_placement:
             return True
-        return x_v <= (self.largeur_conteneur - rect.largeur) // 2
+        return x_v <= (self.largeur_conteneur - largeur) // 2
 
-    def _regle3_propagation_globale(self, rects, n):
+    def _regle3_propagation_globale(self):
         """ Après un placement, vérifie que toutes les vallées de la skyline peuvent être couvertes par au moins un
         rectangle restant. Coupe les branches où une vallée serait irrémédiablement vide. """
         for seg in self.skyline.segments:
@@ -62,127 +77,137 @@ class DFSSolverPRP(SolveurBase):
                 continue  # segment plein, pas une vallée
 
             hauteur_dispo = self.hauteur_conteneur - seg.hauteur
-            largeur_dispo = self.skyline.largeur_disponible(seg.x, seg.hauteur)
+            largeur_dispo = seg.largeur  # segments fusionnés : largeur disponible = largeur du segment
 
-            peut_couvrir = any(rects[i].largeur <= largeur_dispo and rects[i].hauteur <= hauteur_dispo for i in range(n))
-            if not peut_couvrir:
+            if not self.restants.existe_compatible(largeur_dispo, hauteur_dispo):
                 return False  # cette vallée est insolvable => élagage
         return True
 
-    def _regle4_dead_space(self, rects, n, indice_exclu, largeur_restante, hauteur_dispo):
+    def _regle4_dead_space(self, type_exclu, largeur_restante, hauteur_dispo):
         """ Après avoir placé un rect de largeur w < largeur_vallee, l'espace résiduel
-        (largeur_restante = largeur_vallee - w) doit pouvoir être couvert par au moins un des rectangles restants. """
+        (largeur_restante = largeur_vallee - w) doit pouvoir être couvert par au moins un des rectangles restants
+        (le rect placé, de type type_exclu, ne compte pas). """
         if largeur_restante == 0:
             return True  # pas d'espace résiduel
-        for i in range(n):
-            if i == indice_exclu:
-                continue
-            if rects[i].largeur <= largeur_restante and rects[i].hauteur <= hauteur_dispo:
-                return True
-        return False
+        return self.restants.existe_compatible(largeur_restante, hauteur_dispo, type_exclu)
 
 
-    def _dfs(self, rects, n, premier_placement):
-        """ Fonction récursive du DFS PRP. rects[0:n] = rectangles non encore placés. """
-        self.noeuds_explores += 1
+    def _parametres(self):
+        return {"taille_table": self.taille_table}
+
+    def _initialise_recherche(self, rects):
+        """ Skyline vide ; les rectangles rects, dans cet ordre, forment l'index des non placés. """
+        self._charge(rects)
+        self.skyline = Skyline(self.largeur_conteneur, self.hauteur_conteneur)
+        self.table = TableTransposition(self.taille_table)
+        self.restants = IndexRestants(self.tableau.largeurs, self.tableau.hauteurs)
+
+    def _ouvre_noeud(self):
+        """ Évalue le nœud courant (les rectangles non encore placés sont dans self.restants) et prépare le branchement
+        sur les rectangles pouvant occuper la vallée la plus étroite. Cadre : [candidats, k, type_place, x_v, h_v,
+        largeur_dispo, hauteur_dispo, premier_placement, empreinte], où candidats[k:] reste à essayer et type_place est
+        le type du rectangle posé dans la vallée (None si aucun). """
+        self.stats.noeuds += 1
 
         if self.skyline.est_remplie():
             return True
 
+        # Le sous-arbre ne dépend que de la skyline et des rectangles restants (hors racine, soumise à la règle 2) :
+        # un état déjà réfuté l'est encore
+        premier_placement = not self.places
+        empreinte = None
+        if not premier_placement and self.taille_table:
+            empreinte = self.skyline.empreinte << 64 | self.restants.empreinte
+            if self.table.contient(empreinte):
+                self.stats.elague("transposition", len(self.places))
+                return False
+
         # Choisit la vallée la plus étroite => branchement le plus contraint
         vallee = self.skyline.vallee_plus_etroite()
         x_v, h_v = vallee.x, vallee.hauteur
 
         # Règle 1
-        if not self._regle1_valley_area_check(vallee, rects, n):
-            self.elagages_aire += 1
-            return False
+        if not self._regle1_valley_area_check(vallee):
+            self.stats.elague("regle1_aire", len(self.places))
+            return self._refute(empreinte)
 
-        largeur_dispo = self.skyline.largeur_disponible(x_v, h_v)
+        largeur_dispo = vallee.largeur  # segments fusionnés : largeur disponible = largeur de la vallée
         hauteur_dispo = self.hauteur_conteneur - h_v
 
-        # Collecte des candidats valides
-        candidats = [i for i in range(n) if rects[i].largeur <= largeur_dispo and rects[i].hauteur <= hauteur_dispo]
-
+        candidats = self._candidats(largeur_dispo, hauteur_dispo)
         if not candidats:
-            self.elagages_vallee_vide += 1
-            return False
-
-        # Tri : exact-fit en premier (w == largeur_dispo), puis par aire décroissante
-        # Un exact-fit remplit entièrement la vallée donc pas d'espace résiduel à gérer
-        candidats.sort(key=lambda i: (rects[i].largeur != largeur_dispo, -rects[i].aire()))
-
-        vus = set()
-        candidats_dedupliques = []
-        for idx in candidats:
-            dims = (rects[idx].largeur, rects[idx].hauteur)
-            if dims not in vus:
-                vus.add(dims)
-                candidats_dedupliques.append(idx)
-        candidats = candidats_dedupliques
+            self.stats.elague("vallee_vide", len(self.places))
+            return self._refute(empreinte)
+
+        return [candidats, 0, None, x_v, h_v, largeur_dispo, hauteur_dispo, premier_placement, empreinte]
+
+    def _candidats(self, largeur_dispo, hauteur_dispo):
+        """ Collecte des candidats valides, un seul par type de dimensions (brisure des doublons). Tri : exact-fit en
+        premier (w == largeur_dispo), puis par aire décroissante. Un exact-fit remplit entièrement la vallée donc pas
+        d'espace résiduel à gérer. """
+        restants = self.restants
+        candidats = restants.types_compatibles(largeur_dispo, hauteur_dispo)
+        candidats.sort(key=lambda t: (restants.largeurs[t] != largeur_dispo, -restants.aires[t]))
+        return candidats
+
+    def _refute(self, empreinte):
+        """ Mémorise l'état courant comme irréalisable (s'il est éligible à la table). """
+        if empreinte is not None:
+            self.table.ajoute(empreinte)
+        return False
 
-        for idx in candidats:
-            rect = rects[idx]
+    def _branche_suivante(self, cadre):
+        """ Backtracking du rectangle posé par le cadre, puis placement du candidat suivant qui passe les règles 2
+        à 4. """
+        candidats, k, type_place, x_v, h_v, largeur_dispo, hauteur_dispo, premier_placement, _ = cadre
+        restants = self.restants
+        if type_place is not None:
+            i = self.places[-1]
+            self._enlever(i)
+            restants.remettre(type_place, i)
+            cadre[2] = None
+
+        while k < len(candidats):
+            t = candidats[k]
+            k += 1
 
             # Règle 2
-            if not self._regle2_symetrie(rect, x_v, premier_placement):
+            if not self._regle2_symetrie(restants.largeurs[t], x_v, premier_placement):
                 continue
 
             # Règle 4
-            largeur_restante = largeur_dispo - rect.largeur
-            if not self._regle4_dead_space(rects, n, idx, largeur_restante, hauteur_dispo):
-                self.elagages_dead_space += 1
+            largeur_restante = largeur_dispo - restants.largeurs[t]
+            if not self._regle4_dead_space(t, largeur_restante, hauteur_dispo):
+                self.stats.elague("regle4_dead_space", len(self.places))
                 continue
 
-            # Placement + swap pour retirer idx des non-placés
-            rects[idx], rects[n - 1] = rects[n - 1], rects[idx]
-            self._placer(rect, x_v, h_v)
+            # Placement : le rectangle quitte l'index des non-placés
+            i = restants.retirer(t)
+            self._placer(i, x_v, h_v)
 
             # Règle 3
-            if not self._regle3_propagation_globale(rects, n - 1):
-                self.elagages_propagation += 1
-                self._enlever(rect)
-                rects[idx], rects[n - 1] = rects[n - 1], rects[idx]
+            if not self._regle3_propagation_globale():
+                self.stats.elague("regle3_propagation", len(self.places) - 1)
+                self._enlever(i)
+                restants.remettre(t, i)
                 continue
 
-            if self._dfs(rects, n - 1, False):
-                return True
-
-            # Backtracking
-            self._enlever(rect)
-            rects[idx], rects[n - 1] = rects[n - 1], rects[idx]
+            cadre[1] = k
+            cadre[2] = t
+            return True
 
+        cadre[1] = k
         return False
 
+    def _rejoue(self, cadre):
+        if cadre[2] is not None:
+            self._placer(self.restants.retirer(cadre[2]), cadre[3], cadre[4])
 
-    def emballe(self, rectangles, ordre="decroissant"):
-        """ Tente de résoudre l'instance PRP. """
-        self.rectangles_places      = []
-        self.noeuds_explores        = 0
-        self.elagages_vallee_vide   = 0
-        self.elagages_aire          = 0
-        self.elagages_propagation   = 0
-        self.elagages_dead_space    = 0
-        self.skyline = Skyline(self.largeur_conteneur, self.hauteur_conteneur)
-
-        for r in rectangles: r.reset_position()
-
-        rects_a_placer = list(rectangles)
-
-        if ordre == "decroissant":
-            rects_a_placer.sort(key=lambda r: r.aire(), reverse=True)
-        elif ordre == "croissant":
-            rects_a_placer.sort(key=lambda r: r.aire())
+    def _ferme_noeud(self, cadre):
+        self._refute(cadre[8])
 
-        return self._dfs(rects_a_placer, len(rects_a_placer), True)
 
     def affiche_stats(self):
-        total = (self.elagages_vallee_vide + self.elagages_aire +
-                 self.elagages_propagation + self.elagages_dead_space)
-        print(f"        Noeuds explorés         : {self.noeuds_explores}")
-        print(f"        Élagages vallée vide     : {self.elagages_vallee_vide}")
-        print(f"        Élagages aire (R1)       : {self.elagages_aire}")
-        print(f"        Élagages propagation (R3): {self.elagages_propagation}")
-        print(f"        Élagages dead space (R4) : {self.elagages_dead_space}")
-        if self.noeuds_explores > 0:
-            print(f"        Taux d'élagage total    : {100 * total / self.noeuds_explores:.1f}%")
+        self.stats.affiche()
+        if self.taille_table:
+            self.table.affiche_stats()
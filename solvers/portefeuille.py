@@ -0,0 +1,127 @@
+""" Portefeuille de solveurs : plusieurs solveurs (et ordres de tri) lancés en parallèle sur la même instance. """
+
+import time
+
+from solvers.base import SolveurBase
+from solvers.bottom_left import BottomLeft
+from solvers.dfs import DFS
+from solvers.dfs_prp import DFSSolverPRP
+
+
+def _resout_membre(connexion, classe_solveur, ordre, largeur, hauteur, rectangles):
+    """ Tâche exécutée dans un processus fils : résout l'instance avec un membre du portefeuille et renvoie par le tube
+    la liste des placements (indice du rectangle, x, y) ou None si échec, ainsi que les statistiques du solveur. """
+    solveur = classe_solveur(largeur, hauteur)
+    placements = None
+    if solveur.emballe(rectangles, ordre=ordre):
+        indices = {id(r): i for i, r in enumerate(rectangles)}
+        placements = [(indices[id(r)], r.x, r.y) for r in solveur.rectangles_places]
+    connexion.send((placements, solveur.stats.vers_dict()))
+    connexion.close()
+
+
+class Portefeuille(SolveurBase):
+    """ Lance chaque membre (classe de solveur, ordre de tri) dans son propre processus et retient le premier résultat
+    décisif : une solution, quel que soit le membre, ou un échec d'un membre complet, qui prouve que le conteneur est
+    irréalisable (ECHEC_PROUVE, ou DFSSolverPRP quand l'aire des rectangles est celle du conteneur). Les autres
+    membres sont alors interrompus. Le meilleur solveur dépend de l'instance : Bottom-Left réussit souvent tout de
+    suite dans un conteneur large, DFSSolverPRP sur un emballage parfait, et DFS est le seul complet sinon.
+    Un ordre None désigne l'ordre passé à emballe. Les membres à emballage parfait ne sont lancés que si l'aire des
+    rectangles est celle du conteneur (ils échoueraient sinon).
+    Le portefeuille étant déjà parallèle, ChercheurConteneurOptimal l'utilise en séquentiel (nb_processus=1). """
+
+    MEMBRES = ((BottomLeft, "decroissant"), (BottomLeft, "croissant"), (DFSSolverPRP, None), (DFS, None))
+
+    # Index inutile : les placements sont calculés dans les processus membres, puis recopiés
+    classe_occupation = None
+
+    def __init__(self, largeur, hauteur, membres=None):
+        super().__init__(largeur, hauteur)
+        self.membres = tuple(self.MEMBRES if membres is None else membres)
+        self.statut = None  # "solution", "irrealisable" (prouvé par un membre complet) ou "inconnu"
+        self.vainqueur = None  # membre (classe, ordre) dont le résultat a été retenu
+
+    @classmethod
+    def lance_processus(cls, parametres):
+        return True
+
+    @property
+    def echec_prouve(self):
+        """ L'échec n'est prouvé que si un membre complet a tranché (voir SolveurBase.echec_prouve). """
+        return self.statut == "irrealisable"
+
+    def _est_complet(self, classe_solveur, aire_rectangles):
+        aire_conteneur = self.largeur_conteneur * self.hauteur_conteneur
+        return classe_solveur.ECHEC_PROUVE or (classe_solveur.EMBALLAGE_PARFAIT and aire_rectangles == aire_conteneur)
+
+    def emballe(self, rectangles, ordre="decroissant", budget_temps=None):
+        """ Emballe les rectangles avec le premier membre décisif. Retourne True (tous placés), False si tous les
+        membres ont échoué (statut "irrealisable" si l'un d'eux est complet, "inconnu" sinon) ou None si le budget de
+        temps (secondes) est épuisé avant un résultat décisif. """
+        import multiprocessing  # importé seulement à la résolution (démarrage plus rapide)
+        from multiprocessing.connection import wait
+
+        self.stats.reinitialise()
+        self._charge(rectangles)
+        self.statut = "inconnu"
+        self.vainqueur = None
+        debut = time.perf_counter()
+        limite = None if budget_temps is None else debut + budget_temps
+
+        aire_rectangles = sum(r.aire() for r in rectangles)
+        aire_conteneur = self.largeur_conteneur * self.hauteur_conteneur
+        membres = [(classe, ordre if ordre_membre is None else ordre_membre) for classe, ordre_membre in self.membres
+                   if not classe.EMBALLAGE_PARFAIT or aire_rectangles == aire_conteneur]
+
+        contexte = multiprocessing.get_context()
+        en_cours = {}  # connexion -> (membre, processus)
+        try:
+            for classe, ordre_membre in membres:
+                reception, emission = contexte.Pipe(duplex=False)
+                processus = contexte.Process(target=_resout_membre, daemon=True,
+                                             args=(emission, classe, ordre_membre, self.largeur_conteneur,
+                                                   self.hauteur_conteneur, rectangles))
+                processus.start()
+                emission.close()
+                en_cours[reception] = ((classe, ordre_membre), processus)
+
+            while en_cours and self.vainqueur is None:
+                delai = None if limite is None else max(0.0, limite - time.perf_counter())
+                prets = wait(list(en_cours), delai)
+                if not prets:
+                    return self._termine(None, debut)
+                for reception in prets:
+                    membre, processus = en_cours.pop(reception)
+                    try:
+                        placements, statistiques = reception.recv()
+                    except EOFError:  # membre arrêté sans résultat : il ne tranche pas
+                        self.stats.compte("membres_en_echec")
+                        continue
+                    finally:
+                        reception.close()
+                        processus.join()
+
+                    if placements is not None:
+                        for i, x, y in placements:
+                            self._placer(i, x, y)
+                        self.statut = "solution"
+                    elif self._est_complet(membre[0], aire_rectangles):
+                        self.statut = "irrealisable"
+                    else:
+                        continue
+                    self.vainqueur = membre
+                    self.stats.charge(statistiques)
+                    break
+        finally:
+            for reception, (_, processus) in en_cours.items():
+                processus.terminate()
+                processus.join()
+                reception.close()
+
+        # statut "inconnu" : aucun membre décisif, échec non prouvé
+        return self._termine(self.statut == "solution", debut)
+
+    def _termine(self, resultat, debut):
+        self.stats.duree_s = time.perf_counter() - debut
+        self._ecrit_positions()
+        return resultat
@@ -0,0 +1,391 @@
+""" Moteur de recherche arborescente itératif, commun à DFS et DFSSolverPRP. La récursion est remplacée par une pile
+explicite de cadres (un par nœud ouvert), ce qui permet d'arrêter la recherche sur un budget de nœuds ou de temps, de
+la poursuivre plus tard et de sauvegarder la pile sur disque pour la reprendre dans un autre processus. """
+
+import math
+import os
+import time
+from abc import abstractmethod
+
+from models.rectangle import Rectangle
+from solvers.base import SolveurBase
+
+
+def _travailleur(classe_solveur, largeur, hauteur, parametres, rects, taches, resultats, arret):
+    """ Tâche exécutée dans un processus fils de emballe_parallele : résout les sous-problèmes tirés de la file taches
+    jusqu'à la sentinelle None, une solution, ou l'arrêt global. Chaque sous-problème est exploré par tranches de
+    nœuds (poursuit) pour surveiller l'arrêt. Envoie un unique message (placements ou None, statistiques, interrompu),
+    où placements est la liste ordonnée (numéro dans rects, x, y). Les caches sont conservés d'un sous-problème à
+    l'autre : un état réfuté l'est dans tout l'arbre. """
+    solveur = classe_solveur(largeur, hauteur, **parametres)
+    solveur._rects = rects
+    solveur._initialise_recherche(rects)
+    placements = None
+    interrompu = False
+    while placements is None and not interrompu:
+        cadres = taches.get()
+        if cadres is None:
+            break
+        resultat = solveur._ouvre_sous_probleme(cadres)
+        while resultat is None:
+            if arret.is_set():
+                interrompu = True
+                break
+            resultat = solveur.poursuit(budget_noeuds=solveur.TRANCHE_NOEUDS)
+        if resultat:
+            placements = [(i, solveur.tableau.xs[i], solveur.tableau.ys[i]) for i in solveur.places]
+        elif not interrompu:
+            solveur._reinitialise_recherche()
+    resultats.put((placements, solveur.stats.vers_dict(), interrompu))
+
+
+class SolveurArborescent(SolveurBase):
+    """ Solveur par backtracking dont la recherche est conduite par poursuit(). Les sous-classes décrivent un nœud :
+        - _initialise_recherche(rects) : prépare l'état pour une recherche sur les rectangles rects (ordre fixé).
+        - _ouvre_noeud()               : évalue le nœud courant. Retourne True (solution), False (nœud élagué) ou le
+                                         cadre du nœud, une liste d'entiers / de listes décrivant ses branches.
+        - _branche_suivante(cadre)     : annule la branche en cours du cadre puis applique la suivante. Retourne False
+                                         quand les branches sont épuisées.
+        - _rejoue(cadre)               : ré-applique la branche en cours du cadre (reprise d'une sauvegarde).
+        - _ferme_noeud(cadre)          : appelée quand toutes les branches du nœud ont échoué.
+    Les cadres ne contiennent que des valeurs simples : la pile se sauvegarde telle quelle avec pickle. """
+
+    # Caches de la recherche (tables d'états réfutés) sauvegardés avec la pile : sans eux, une reprise ré-explore les
+    # sous-arbres déjà réfutés (redéfini par les sous-classes)
+    CACHES = ()
+    # Nombre d'itérations entre deux lectures de l'horloge (budget de temps)
+    PERIODE_HORLOGE = 1024
+    # Découpe parallèle : profondeur minimale des sous-problèmes, nombre visé de sous-problèmes par processus, et
+    # taille des tranches de nœuds entre deux consultations de l'arrêt global
+    PROFONDEUR_DECOUPE = 1
+    SOUS_PROBLEMES_PAR_PROCESSUS = 4
+    TRANCHE_NOEUDS = 2000
+
+    def __init__(self, largeur, hauteur):
+        super().__init__(largeur, hauteur)
+        self.statut = None  # "solution", "irrealisable" ou "inconnu" (budget épuisé)
+        self._rects = []
+        self._pile = None  # None => la racine n'a pas encore été ouverte
+
+    @abstractmethod
+    def _initialise_recherche(self, rects):
+        pass
+
+    @abstractmethod
+    def _ouvre_noeud(self):
+        pass
+
+    @abstractmethod
+    def _branche_suivante(self, cadre):
+        pass
+
+    @abstractmethod
+    def _rejoue(self, cadre):
+        pass
+
+    def _ferme_noeud(self, cadre):
+        pass
+
+    def _parametres(self):
+        """ Arguments du constructeur, hors dimensions du conteneur, nécessaires pour recréer le solveur. """
+        return {}
+
+    @staticmethod
+    def ordonne(rectangles, ordre="decroissant"):
+        """ Retourne une copie des rectangles dans l'ordre de placement demandé. """
+        rects_a_placer = list(rectangles)
+        if ordre == "decroissant":
+            rects_a_placer.sort(key=lambda r: r.aire(), reverse=True)
+        elif ordre == "croissant":
+            rects_a_placer.sort(key=lambda r: r.aire())
+        return rects_a_placer
+
+    def emballe(self, rectangles, ordre="decroissant", budget_noeuds=None, budget_temps=None):
+        """ Emballe les rectangles. Retourne True (tous placés), False (instance irréalisable) ou None si le budget de
+        nœuds / de temps (secondes) est épuisé avant la fin : la recherche peut alors être continuée par poursuit() ou
+        sauvegardée par sauvegarde(). """
+        self.stats.reinitialise()
+        self._rects = self.ordonne(rectangles, ordre)
+        self._initialise_recherche(self._rects)
+        self._pile = None
+        self.statut = None
+        return self.poursuit(budget_noeuds, budget_temps)
+
+    def poursuit(self, budget_noeuds=None, budget_temps=None):
+        """ Continue la recherche là où elle s'est arrêtée. Mêmes valeurs de retour que emballe(). Les budgets portent
+        sur cet appel seulement. """
+        if self.statut in ("solution", "irrealisable") and self._pile is not None:
+            return self.statut == "solution"
+
+        debut = time.perf_counter()
+        try:
+            return self._recherche(budget_noeuds, None if budget_temps is None else debut + budget_temps)
+        finally:
+            self.stats.duree_s += time.perf_counter() - debut
+
+    def _recherche(self, budget_noeuds, limite_temps):
+        """ Boucle de la recherche. Le budget de nœuds et le rappel de progression partagent un même seuil : une seule
+        comparaison par itération. """
+        stats = self.stats
+        limite_noeuds = math.inf if budget_noeuds is None else stats.noeuds + budget_noeuds
+
+        if self._pile is None:
+            resultat = self._ouvre_noeud()
+            self._pile = []
+            if resultat is True or resultat is False:
+                return self._termine(resultat)
+            self._pile.append(resultat)
+
+        pile = self._pile
+        ouvre_noeud = self._ouvre_noeud
+        branche_suivante = self._branche_suivante
+        horloge = self.PERIODE_HORLOGE
+        seuil = min(limite_noeuds, stats.prochain_rappel)
+        while pile:
+            if stats.noeuds >= seuil:
+                if stats.noeuds >= limite_noeuds:
+                    return self._interrompt()
+                stats.signale()
+                seuil = min(limite_noeuds, stats.prochain_rappel)
+            if limite_temps is not None:
+                horloge -= 1
+                if not horloge:
+                    horloge = self.PERIODE_HORLOGE
+                    if time.perf_counter() >= limite_temps:
+                        return self._interrompt()
+
+            cadre = pile[-1]
+            if not branche_suivante(cadre):
+                pile.pop()
+                self._ferme_noeud(cadre)
+                continue
+
+            resultat = ouvre_noeud()
+            if resultat is True:
+                return self._termine(True)
+            if resultat is not False:
+                pile.append(resultat)
+
+        return self._termine(False)
+
+    def _termine(self, resultat):
+        self.statut = "solution" if resultat else "irrealisable"
+        self._ecrit_positions()
+        return resultat
+
+    def _interrompt(self):
+        """ Budget épuisé : les rectangles de l'appelant reçoivent les placements en cours. """
+        self.statut = "inconnu"
+        self._ecrit_positions()
+        return None
+
+    def _rejoue_placements(self, rects, placements):
+        """ Comme SolveurBase._rejoue_placements, l'état de la recherche (histogrammes, région, ...) étant d'abord
+        initialisé pour rects : _placer le met à jour comme pendant la recherche. """
+        self._rects = list(rects)
+        self._initialise_recherche(self._rects)
+        for i, x, y in placements:
+            self._placer(i, x, y)
+        self._ecrit_positions()
+
+    #  Découpe de l'arbre et recherche multi-processus
+    def _reinitialise_recherche(self):
+        """ Remet l'état à la racine (conteneur vide) en conservant les caches. """
+        caches = {nom: getattr(self, nom) for nom in self.CACHES}
+        self._initialise_recherche(self._rects)
+        for nom, cache in caches.items():
+            setattr(self, nom, cache)
+
+    def _decoupe(self, profondeur):
+        """ Parcourt l'arbre jusqu'à la profondeur donnée et retourne (resultat, sous_problemes). Un sous-problème est
+        la liste des cadres (copiés) du chemin depuis la racine, branche en cours appliquée : le sous-arbre sous cette
+        branche est indépendant des autres. resultat vaut True si une solution est atteinte avant la profondeur (l'état
+        est alors celui de la solution), False sinon. Les nœuds de la découpe ne sont pas fermés : leurs sous-arbres
+        ne sont pas réfutés ici. """
+        resultat = self._ouvre_noeud()
+        if resultat is True or resultat is False:
+            return resultat, []
+
+        pile = [resultat]
+        sous_problemes = []
+        while pile:
+            cadre = pile[-1]
+            if not self._branche_suivante(cadre):
+                pile.pop()
+                continue
+            if len(pile) == profondeur:
+                sous_problemes.append([list(c) for c in pile])
+                continue
+            resultat = self._ouvre_noeud()
+            if resultat is True:
+                return True, []
+            if resultat is not False:
+                pile.append(resultat)
+        return False, sous_problemes
+
+    def _ouvre_sous_probleme(self, cadres):
+        """ Rejoue le chemin d'un sous-problème depuis la racine et ouvre le nœud atteint, qui devient la seule racine
+        de la pile. Retourne True / False si ce nœud est une solution / est élagué, None s'il reste à explorer par
+        poursuit(). """
+        for cadre in cadres:
+            self._rejoue(cadre)
+        resultat = self._ouvre_noeud()
+        if resultat is True or resultat is False:
+            self._pile = []
+            return self._termine(resultat)
+        self._pile = [resultat]
+        self.statut = None
+        return None
+
+    def emballe_parallele(self, rectangles, ordre="decroissant", nb_processus=None, budget_temps=None):
+        """ Emballe les rectangles en répartissant l'arbre de recherche sur nb_processus processus (None => tous les
+        cœurs). Le haut de l'arbre est découpé en sous-problèmes indépendants (au moins PROFONDEUR_DECOUPE niveaux,
+        plus si nécessaire pour en obtenir SOUS_PROBLEMES_PAR_PROCESSUS par processus), placés dans une file partagée
+        où les processus viennent se servir. Dès qu'un processus trouve une solution, tous les autres s'arrêtent ; ses
+        placements sont rejoués sur les rectangles de l'appelant. Les compteurs sont la somme de ceux de la découpe et
+        des processus. Mêmes valeurs de retour que emballe() (None si budget_temps est épuisé) ; la recherche
+        parallèle ne se poursuit ni ne se sauvegarde. """
+        if nb_processus is None:
+            nb_processus = os.cpu_count() or 1
+        self.stats.reinitialise()
+        self._rects = self.ordonne(rectangles, ordre)
+        self._initialise_recherche(self._rects)
+        self._pile = None
+        self.statut = None
+        if nb_processus <= 1:
+            return self.poursuit(budget_temps=budget_temps)
+
+        debut = time.perf_counter()
+        try:
+            return self._recherche_parallele(nb_processus, None if budget_temps is None else debut + budget_temps)
+        finally:
+            self.stats.duree_s = time.perf_counter() - debut
+
+    def _recherche_parallele(self, nb_processus, limite_temps):
+        # Découpe : on approfondit tant que les sous-problèmes sont trop peu nombreux pour occuper les processus
+        # (une découpe ramène l'état à la racine ; les compteurs d'une découpe abandonnée sont annulés)
+        profondeur = self.PROFONDEUR_DECOUPE
+        while True:
+            compteurs = self.stats.vers_dict()
+            resultat, sous_problemes = self._decoupe(profondeur)
+            if resultat is True:
+                self._pile = []
+                return self._termine(True)
+            if (not sous_problemes or profondeur >= len(self._rects) or
+                    len(sous_problemes) >= self.SOUS_PROBLEMES_PAR_PROCESSUS * nb_processus):
+                break
+            self.stats.charge(compteurs)
+            profondeur += 1
+
+        self._pile = []
+        if not sous_problemes:
+            return self._termine(False)
+
+        import multiprocessing  # importés seulement pour la recherche parallèle (démarrage plus rapide)
+        import queue
+
+        contexte = multiprocessing.get_context()
+        taches = contexte.Queue()
+        resultats = contexte.Queue()
+        arret = contexte.Event()
+        nb_processus = min(nb_processus, len(sous_problemes))
+        for cadres in sous_problemes:
+            taches.put(cadres)
+        for _ in range(nb_processus):
+            taches.put(None)
+        processus = [contexte.Process(target=_travailleur, daemon=True,
+                                      args=(type(self), self.largeur_conteneur, self.hauteur_conteneur,
+                                            self._parametres(), self._rects, taches, resultats, arret))
+                     for _ in range(nb_processus)]
+        for p in processus:
+            p.start()
+
+        placements = None
+        interrompu = False
+        try:
+            recus = 0
+            while recus < nb_processus:
+                try:
+                    message = resultats.get(timeout=0.1)
+                except queue.Empty:
+                    if limite_temps is not None and time.perf_counter() >= limite_temps:
+                        arret.set()
+                    if not any(p.is_alive() for p in processus) and resultats.empty():
+                        raise RuntimeError("Un processus de la recherche parallèle s'est arrêté sans résultat.")
+                    continue
+                recus += 1
+                placements_recus, statistiques, interrompu_recu = message
+                self.stats.cumule(statistiques)
+                interrompu = interrompu or interrompu_recu
+                if placements_recus is not None and placements is None:
+                    placements = placements_recus
+                    arret.set()
+        finally:
+            arret.set()
+            taches.cancel_join_thread()  # sous-problèmes restants : inutiles
+            for p in processus:
+                p.join(timeout=1)
+                if p.is_alive():
+                    p.terminate()
+                    p.join()
+
+        if placements is None:
+            if interrompu:
+                return self._interrompt()
+            return self._termine(False)
+
+        self._rejoue_placements(self._rects, placements)
+        return self._termine(True)
+
+    #  Sauvegarde / reprise
+    def sauvegarde(self, chemin):
+        """ Écrit sur disque de quoi reprendre la recherche : rectangles dans l'ordre de placement, pile des cadres,
+        statistiques et caches. Les empreintes des caches ne dépendent pas du processus (clés de Zobrist
+        déterministes). """
+        etat = {
+            "classe": type(self).__name__,
+            "largeur": self.largeur_conteneur,
+            "hauteur": self.hauteur_conteneur,
+            "parametres": self._parametres(),
+            "rectangles": [(r.largeur, r.hauteur, r.id) for r in self._rects],
+            "pile": self._pile,
+            "statut": self.statut,
+            "statistiques": self.stats.vers_dict(),
+            "caches": {nom: getattr(self, nom) for nom in self.CACHES},
+        }
+        import pickle
+
+        with open(chemin, "wb") as fichier:
+            pickle.dump(etat, fichier, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def reprend(cls, chemin, rectangles=None):
+        """ Recrée un solveur à partir d'une sauvegarde, l'état de la recherche restauré (les branches en cours de la
+        pile sont rejouées). rectangles : objets Rectangle à réutiliser, dans l'ordre de placement sauvegardé (de
+        nouveaux rectangles sont créés sinon). Il suffit ensuite d'appeler poursuit(). Les rectangles reçoivent les
+        placements de la pile, comme à la sauvegarde : la solution d'une recherche terminée est donc disponible. """
+        import pickle
+
+        with open(chemin, "rb") as fichier:
+            etat = pickle.load(fichier)
+        if etat["classe"] != cls.__name__:
+            raise ValueError(f"Sauvegarde de {etat['classe']}, pas de {cls.__name__}")
+
+        if rectangles is None:
+            rectangles = [Rectangle(w, h, id) for w, h, id in etat["rectangles"]]
+        elif [(r.largeur, r.hauteur) for r in rectangles] != [(w, h) for w, h, _ in etat["rectangles"]]:
+            raise ValueError("Les rectangles ne correspondent pas à la sauvegarde")
+
+        solveur = cls(etat["largeur"], etat["hauteur"], **etat["parametres"])
+        solveur._rects = list(rectangles)
+        solveur._initialise_recherche(solveur._rects)
+        solveur._pile = etat["pile"]
+        if solveur._pile is not None:
+            for cadre in solveur._pile:
+                solveur._rejoue(cadre)
+        solveur.stats.charge(etat["statistiques"])
+        for nom, cache in etat["caches"].items():
+            setattr(solveur, nom, cache)
+        solveur.statut = etat["statut"]
+        solveur._ecrit_positions()
+        return solveur
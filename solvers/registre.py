@@ -0,0 +1,25 @@
+""" Registre des solveurs par nom, partagé par la ligne de commande, la résolution par lots et les campagnes de
+benchmarks. Les modules des solveurs ne sont importés qu'à la demande (démarrage rapide de main.py). """
+
+import importlib
+
+# Solveurs par nom : (module, classe)
+SOLVEURS = {
+    "BottomLeft": ("solvers.bottom_left", "BottomLeft"),
+    "DFS": ("solvers.dfs", "DFS"),
+    "DFSDeuxPhases": ("solvers.dfs_deux_phases", "DFSDeuxPhases"),
+    "DFSSolverPRP": ("solvers.dfs_prp", "DFSSolverPRP"),
+    "Portefeuille": ("solvers.portefeuille", "Portefeuille"),
+}
+
+# Solveurs utilisables dans un processus démon (groupes de processus des lots et des campagnes) : le Portefeuille
+# lance ses membres dans des processus, ce qu'un démon ne peut pas faire
+SOLVEURS_DEMONS = tuple(nom for nom in SOLVEURS if nom != "Portefeuille")
+
+
+def classe_solveur(nom):
+    """ Retourne la classe du solveur nommé nom (importe son module). """
+    if nom not in SOLVEURS:
+        raise ValueError(f"Solveur inconnu : {nom!r} (attendu : {', '.join(SOLVEURS)})")
+    module, classe = SOLVEURS[nom]
+    return getattr(importlib.import_module(module), classe)
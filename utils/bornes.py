@@ -0,0 +1,74 @@
+""" Relaxation 1D de Korf : histogrammes des capacités libres (rangées ou colonnes du conteneur) et borne inférieure
+de Martello & Toth sur l'espace gaspillé. Partagée par DFS et DFSDeuxPhases. """
+
+
+def decale_capacites(capacites, bins, masque, debut, fin, delta):
+    """ Ajoute delta à la capacité libre des rangées (ou colonnes) debut..fin-1 et déplace chacune dans l'histogramme
+    bins (bins[c] = nombre de rangées de capacité c). masque a le bit c à 1 si bins[c] > 0 ; retourne le nouveau
+    masque. """
+    for rangee in range(debut, fin):
+        c = capacites[rangee]
+        bins[c] -= 1
+        if not bins[c]:
+            masque &= ~(1 << c)
+        c += delta
+        capacites[rangee] = c
+        bins[c] += 1
+        masque |= 1 << c
+    return masque
+
+
+def borne_martello_toth(bins, items, tailles):
+    """ Calcule une borne inférieure sur le gaspillage. bins[c] = nombre de bins de capacité c, items[t] = aire des
+    items de taille t, tailles = masque des tailles présentes (bins ou items), parcourues par ordre croissant. Les
+    tailles absentes ne modifient ni le gaspillage ni le report : le coût dépend du nombre de tailles distinctes. """
+    gaspillage = 0
+    carryover = 0
+
+    while tailles:
+        bit = tailles & -tailles  # plus petite taille restante
+        tailles ^= bit
+        taille = bit.bit_length() - 1
+
+        bin_area = bins[taille] * taille  # espace dans les bins de capacité exacte = taille
+        total_items = carryover + items[taille]  # aire des items de taille exacte = taille, plus le report
+
+        if bin_area > total_items:  # surplus de capacité
+            gaspillage += bin_area - total_items
+            carryover = 0
+        else:  # surplus d'items
+            carryover = total_items - bin_area
+
+    return gaspillage
+
+
+def conteneur_irrealisable(largeurs, hauteurs, largeur, hauteur):
+    """ Bornes statiques (sans recherche) sur le conteneur largeur × hauteur pour des rectangles de dimensions
+    largeurs[i] × hauteurs[i]. Retourne le nom de la première borne qui prouve qu'aucun placement n'existe, ou None :
+        - dimensions    : un rectangle est plus large ou plus haut que le conteneur
+        - aire          : l'aire des rectangles dépasse celle du conteneur
+        - moities       : les rectangles plus larges que la moitié du conteneur ne peuvent pas être côte à côte et
+                          sont donc empilés ; leurs hauteurs cumulées dépassent la hauteur (de même en hauteur)
+        - martello_toth : relaxation 1D de Korf à conteneur vide (rangées puis colonnes) """
+    if max(largeurs) > largeur or max(hauteurs) > hauteur:
+        return "dimensions"
+    aire = sum(w * h for w, h in zip(largeurs, hauteurs))
+    aire_conteneur = largeur * hauteur
+    if aire > aire_conteneur:
+        return "aire"
+    if sum(h for w, h in zip(largeurs, hauteurs) if 2 * w > largeur) > hauteur or \
+            sum(w for w, h in zip(largeurs, hauteurs) if 2 * h > hauteur) > largeur:
+        return "moities"
+
+    # Rangées (capacité largeur, tranches de largeur w) puis colonnes (capacité hauteur, tranches de hauteur h)
+    for capacite, nb_bins, tailles, autres in ((largeur, hauteur, largeurs, hauteurs),
+                                               (hauteur, largeur, hauteurs, largeurs)):
+        bins = [0] * (capacite + 1)
+        bins[capacite] = nb_bins
+        items = [0] * (capacite + 1)
+        for t, u in zip(tailles, autres):
+            items[t] += t * u
+        masque = 1 << capacite | sum(1 << t for t in set(tailles))
+        if aire + borne_martello_toth(bins, items, masque) > aire_conteneur:
+            return "martello_toth"
+    return None
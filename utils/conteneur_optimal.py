@@ -1,13 +1,37 @@
 """ Utilitaire de recherche du conteneur optimal pour un solveur donné. """
 
+import itertools
 import math
+import os
+
+from utils.bornes import conteneur_irrealisable
+from utils.statistiques import Statistiques
+
+MAX_CANDIDATS = 500  # nombre maximal de conteneurs candidats essayés
+
+
+def _resout_candidat(connexion, classe_solveur, parametres, rectangles, largeur, hauteur, ordre):
+    """ Tâche exécutée dans un processus fils : tente un conteneur candidat et renvoie par le tube la liste ordonnée
+    des placements (indice du rectangle, x, y), ou None si échec, les statistiques du solveur et si l'échec est
+    prouvé. """
+    solveur = classe_solveur(largeur, hauteur, **parametres)
+    placements = None
+    if solveur.emballe(rectangles, ordre=ordre):
+        indices = {id(r): i for i, r in enumerate(rectangles)}
+        placements = [(indices[id(r)], r.x, r.y) for r in solveur.rectangles_places]
+    connexion.send((placements, solveur.stats.vers_dict(), placements is None and solveur.echec_prouve))
+    connexion.close()
 
 
 class ChercheurConteneurOptimal:
     """ Génère automatiquement une liste de conteneurs candidats de dimensions variées, triés par aire croissante. La
     génération part d'une borne inférieure calculée et teste systématiquement différentes combinaisons largeur-hauteur.
     Pour chaque candidat, elle instancie le solveur fourni et tente le placement. Dès qu'un conteneur permet de placer
-    tous les rectangles avec succès, la recherche s'arrête et retourne ce conteneur. """
+    tous les rectangles avec succès, la recherche s'arrête et retourne ce conteneur.
+    Un candidat est écarté sans lancer le solveur s'il est réfuté par une borne statique (voir
+    conteneur_irrealisable) ou dominé par un conteneur prouvé irréalisable : si L×H est irréalisable, tout conteneur
+    L'×H' avec L' <= L et H' <= H l'est aussi. Seuls les échecs prouvés (echec_prouve du solveur) enrichissent cette
+    frontière, conservée d'une recherche à l'autre. """
 
     def __init__(self, rectangles, classe_solveur):
         """ Initialise le chercheur avec une liste de rectangles et une classe solveur (pas une instance). """
@@ -16,48 +40,198 @@ class ChercheurConteneurOptimal:
         self.aire_totale = sum(r.aire() for r in rectangles)
         self.largeur_max = max(r.largeur for r in rectangles)
         self.hauteur_max = max(r.hauteur for r in rectangles)
+        self.largeurs = [r.largeur for r in rectangles]
+        self.hauteurs = [r.hauteur for r in rectangles]
+        self.stats = Statistiques()  # statistiques des solveurs cumulées sur tous les candidats tranchés
+        self.irrealisables = []  # frontière : conteneurs (largeur, hauteur) irréalisables, aucun n'en domine un autre
 
-    def genere_conteneurs_candidats(self, max_candidats=500):
-        candidats = set()  # pour éviter les doublons
-
+    def conteneurs_candidats(self):
+        """ Itère sur les conteneurs candidats (largeur <= hauteur) par aire croissante. La liste est calculée en
+        entier (un candidat par largeur, puis un tri) : l'aire d'un candidat ne croît pas avec sa largeur, aucun ne
+        peut donc être émis avant d'avoir vu toutes les largeurs. L'itération évite seulement de trancher les
+        candidats qui ne seront pas consommés. """
         # Borne inférieure : plus grand rectangle
         largeur_min = self.largeur_max
         hauteur_min = self.hauteur_max
 
-        # Borne supérieure : somme de toutes les largeurs
-        largeur_max_test = sum(r.largeur for r in self.rectangles)
+        # Borne supérieure : somme de toutes les largeurs, et au-delà de aire_max / hauteur_min, même la hauteur
+        # minimale donne une aire trop grande
+        aire_max = self.aire_totale * 1.15
+        largeur_max_test = min(sum(self.largeurs), int(aire_max // hauteur_min))
 
+        candidats = set()  # ensemble : évite les doublons (x, y) / (y, x)
         for largeur in range(largeur_min, largeur_max_test + 1):
             # Hauteur minimale : soit la hauteur du plus grand rect, soit ce qui
             # est nécessaire pour contenir l'aire totale
             hauteur = max(math.ceil(self.aire_totale / largeur), hauteur_min)
             aire = largeur * hauteur
 
-            if self.aire_totale * 1.008 < aire <= self.aire_totale * 1.15:
+            if self.aire_totale * 1.008 < aire <= aire_max:
                 # Normaliser pour éviter (x, y) et (y, x)
                 # (!!: pour le bottom left, ajouter les deux car ne produisent pas les mêmes résultats)
-                candidat = tuple(sorted([largeur, hauteur]))
-                candidats.add(candidat)
+                candidats.add((aire,) + tuple(sorted([largeur, hauteur])))
+
+        for _, largeur, hauteur in sorted(candidats):
+            yield largeur, hauteur
 
-        # Tri par aire croissante
-        candidats = sorted(candidats, key=lambda x: (x[0] * x[1]))
+    def genere_conteneurs_candidats(self, max_candidats=MAX_CANDIDATS):
+        """ Retourne la liste des max_candidats premiers conteneurs candidats (voir conteneurs_candidats). """
+        return list(itertools.islice(self.conteneurs_candidats(), max_candidats))
 
-        return candidats[:max_candidats]
+    def _domine(self, largeur, hauteur):
+        """ Retourne True si le conteneur tient dans un conteneur prouvé irréalisable. """
+        return any(largeur <= l and hauteur <= h for l, h in self.irrealisables)
 
-    def trouve_conteneur_optimal(self, ordre="decroissant"):
+    def _ajoute_irrealisable(self, largeur, hauteur):
+        """ Ajoute un conteneur irréalisable à la frontière, dont il retire les conteneurs qu'il domine. """
+        if self._domine(largeur, hauteur):
+            return
+        self.irrealisables = [(l, h) for l, h in self.irrealisables if not (l <= largeur and h <= hauteur)]
+        self.irrealisables.append((largeur, hauteur))
+
+    def _ecarte(self, largeur, hauteur):
+        """ Retourne True si le candidat est tranché sans lancer le solveur : dominé par la frontière, ou réfuté par
+        une borne statique (il rejoint alors la frontière). """
+        if self._domine(largeur, hauteur):
+            self.stats.compte("candidats_domines")
+            return True
+        borne = conteneur_irrealisable(self.largeurs, self.hauteurs, largeur, hauteur)
+        if borne is None:
+            return False
+        self.stats.compte("candidats_" + borne)
+        self._ajoute_irrealisable(largeur, hauteur)
+        return True
+
+    def trouve_conteneur_optimal(self, ordre="decroissant", nb_processus=1, parametres_solveur=None):
         """ Trouve le plus petit conteneur possible avec le solveur fourni.
+        Avec nb_processus > 1 (ou None pour tous les cœurs), plusieurs candidats sont résolus en parallèle ; le
+        résultat reste identique à la recherche séquentielle (premier candidat réalisable par aire croissante). Un
+        solveur qui lance ses propres processus (lance_processus, par exemple un Portefeuille) est utilisé en
+        séquentiel : les processus des candidats, démons, ne peuvent pas avoir d'enfants.
+        parametres_solveur : paramètres nommés passés au solveur de chaque candidat, pour cette recherche (par exemple
+        {"membres": ((BottomLeft, "croissant"), (DFS, None))} pour un Portefeuille).
         Retourne un tuple (dimensions, solveur) ou (None, None) si échec. """
-        candidats = self.genere_conteneurs_candidats()
-
-        for largeur, hauteur in candidats:
-            solveur = self.classe_solveur(largeur, hauteur)
-            if solveur.emballe(self.rectangles, ordre=ordre):
-                aire_conteneur = largeur * hauteur
-                pourcentage_gaspillage = (solveur.espace_perdu() / aire_conteneur) * 100
-                print(f"    Solution trouvée :")
-                print(f"        Conteneur : {largeur}×{hauteur} (aire = {aire_conteneur})")
-                print(f"        Gaspillage : {solveur.espace_perdu()} ({pourcentage_gaspillage:.2f}%)")
+        self.stats = Statistiques()
+        parametres = parametres_solveur or {}
+
+        if nb_processus is None:
+            nb_processus = os.cpu_count() or 1
+        if nb_processus > 1 and self.classe_solveur.lance_processus(parametres):
+            nb_processus = 1
+        if nb_processus > 1:
+            return self._trouve_conteneur_parallele(self.genere_conteneurs_candidats(), ordre, nb_processus,
+                                                    parametres)
+
+        for largeur, hauteur in itertools.islice(self.conteneurs_candidats(), MAX_CANDIDATS):
+            if self._ecarte(largeur, hauteur):
+                continue
+            solveur = self.classe_solveur(largeur, hauteur, **parametres)
+            succes = solveur.emballe(self.rectangles, ordre=ordre)
+            self.stats.cumule(solveur.stats.vers_dict())
+            if succes:
+                self._affiche_solution(largeur, hauteur, solveur)
                 return (largeur, hauteur), solveur
+            if solveur.echec_prouve:
+                self._ajoute_irrealisable(largeur, hauteur)
 
         print("Aucune solution trouvée dans les candidats générés.")
         return None, None
+
+    def _trouve_conteneur_parallele(self, candidats, ordre, nb_processus, parametres):
+        """ Résout les candidats dans un pool de nb_processus processus, lancés par aire croissante. Dès qu'un
+        candidat réussit, les candidats plus grands en cours sont interrompus et plus aucun n'est lancé ; on attend
+        seulement la fin des candidats plus petits encore en cours, qui restent prioritaires. Un candidat prouvé
+        irréalisable interrompt les candidats en cours qu'il domine. """
+        import multiprocessing  # importé seulement pour la recherche parallèle (démarrage plus rapide)
+        from multiprocessing.connection import wait
+
+        contexte = multiprocessing.get_context()
+        en_cours = {}  # connexion -> (indice du candidat, processus)
+        resultats = {}  # indice du candidat -> (placements ou None, statistiques)
+        meilleur = len(candidats)  # indice du plus petit candidat réalisable connu
+        prochain = 0
+
+        try:
+            while True:
+                # Remplit le pool avec les candidats suivants, tant qu'ils peuvent encore battre le meilleur connu
+                while len(en_cours) < nb_processus and prochain < meilleur:
+                    largeur, hauteur = candidats[prochain]
+                    if self._ecarte(largeur, hauteur):
+                        resultats[prochain] = (None, {}, True)
+                        prochain += 1
+                        continue
+                    reception, emission = contexte.Pipe(duplex=False)
+                    processus = contexte.Process(target=_resout_candidat, daemon=True,
+                                                 args=(emission, self.classe_solveur, parametres, self.rectangles,
+                                                       largeur, hauteur, ordre))
+                    processus.start()
+                    emission.close()
+                    en_cours[reception] = (prochain, processus)
+                    prochain += 1
+
+                # Tous les candidats plus petits que le meilleur sont tranchés => c'est le résultat séquentiel
+                if all(i in resultats for i in range(meilleur)) and not en_cours:
+                    break
+
+                for reception in wait(list(en_cours)):
+                    if reception not in en_cours:  # interrompu par un résultat reçu juste avant
+                        continue
+                    indice, processus = en_cours.pop(reception)
+                    try:
+                        resultats[indice] = reception.recv()
+                    except EOFError:
+                        raise RuntimeError(f"Le processus du candidat {candidats[indice]} s'est arrêté sans résultat.")
+                    finally:
+                        reception.close()
+                        processus.join()
+
+                    self.stats.cumule(resultats[indice][1])
+                    if resultats[indice][0] is not None and indice < meilleur:
+                        meilleur = indice
+                        self._interrompt(en_cours, lambda i: i > meilleur)
+                    elif resultats[indice][2]:
+                        self._ajoute_irrealisable(*candidats[indice])
+                        for i in self._interrompt(en_cours, lambda i: self._domine(*candidats[i])):
+                            self.stats.compte("candidats_domines")
+                            resultats[i] = (None, {}, True)
+        finally:
+            self._interrompt(en_cours, lambda i: True)
+
+        if meilleur == len(candidats):
+            print("Aucune solution trouvée dans les candidats générés.")
+            return None, None
+
+        largeur, hauteur = candidats[meilleur]
+        placements, statistiques, _ = resultats[meilleur]
+        solveur = self._reconstruit_solveur(largeur, hauteur, placements, statistiques, parametres)
+        self._affiche_solution(largeur, hauteur, solveur)
+        return (largeur, hauteur), solveur
+
+    @staticmethod
+    def _interrompt(en_cours, condition):
+        """ Termine les processus en cours dont l'indice de candidat vérifie la condition. Retourne ces indices. """
+        interrompus = []
+        for reception in [r for r, (i, _) in en_cours.items() if condition(i)]:
+            indice, processus = en_cours.pop(reception)
+            processus.terminate()
+            processus.join()
+            reception.close()
+            interrompus.append(indice)
+        return interrompus
+
+    def _reconstruit_solveur(self, largeur, hauteur, placements, statistiques, parametres):
+        """ Rejoue dans le processus principal les placements trouvés par un processus fils, afin que le solveur
+        retourné référence (et positionne) les rectangles de l'appelant, comme en séquentiel. L'état interne du solveur
+        (histogrammes de DFS, ...) est celui d'une recherche qui aurait trouvé ces placements. """
+        solveur = self.classe_solveur(largeur, hauteur, **parametres)
+        solveur._rejoue_placements(self.rectangles, placements)
+        solveur.stats.charge(statistiques)
+        return solveur
+
+    @staticmethod
+    def _affiche_solution(largeur, hauteur, solveur):
+        aire_conteneur = largeur * hauteur
+        pourcentage_gaspillage = (solveur.espace_perdu() / aire_conteneur) * 100
+        print(f"    Solution trouvée :")
+        print(f"        Conteneur : {largeur}×{hauteur} (aire = {aire_conteneur})")
+        print(f"        Gaspillage : {solveur.espace_perdu()} ({pourcentage_gaspillage:.2f}%)")
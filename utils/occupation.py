@@ -0,0 +1,163 @@
+""" Index d'occupation du conteneur pour les tests de collision. Remplace le parcours de tous les rectangles placés
+par une structure mise à jour à chaque placement/retrait, interrogée à chaque sondage d'une position (x, y). """
+
+from abc import ABC, abstractmethod
+
+
+class IndexOccupation(ABC):
+    """ Interface commune des index d'occupation. Une zone (x, y, w, h) désigne le rectangle [x, x+w[ × [y, y+h[. """
+
+    def __init__(self, largeur, hauteur):
+        self.largeur = largeur
+        self.hauteur = hauteur
+
+    @abstractmethod
+    def reinitialiser(self):
+        """ Vide l'index (conteneur vide). """
+        pass
+
+    @abstractmethod
+    def occuper(self, x, y, w, h):
+        """ Marque la zone comme occupée. """
+        pass
+
+    @abstractmethod
+    def liberer(self, x, y, w, h):
+        """ Marque la zone comme libre (annule un occuper). """
+        pass
+
+    @abstractmethod
+    def est_libre(self, x, y, w, h):
+        """ Retourne True si aucune cellule de la zone n'est occupée. """
+        pass
+
+    @abstractmethod
+    def fin_bloquant(self, x, y, w, h):
+        """ Retourne une abscisse x' > x telle qu'aucune position de [x, x'[ sur la ligne y ne soit libre pour un
+        rectangle w×h, ou None si la zone est libre. Sert aux sauts maximaux du DFS. """
+        pass
+
+    def premier_x_libre(self, y, w, h):
+        """ Retourne la plus petite abscisse x telle que la zone (x, y, w, h) soit libre et tienne dans le conteneur,
+        ou None. Implémentation générique par sauts successifs. """
+        x = 0
+        while x <= self.largeur - w:
+            saut = self.fin_bloquant(x, y, w, h)
+            if saut is None:
+                return x
+            x = saut
+        return None
+
+
+class OccupationListe(IndexOccupation):
+    """ Implémentation de référence : parcourt la liste des zones occupées à chaque requête (O(n) par sondage). """
+
+    def __init__(self, largeur, hauteur):
+        super().__init__(largeur, hauteur)
+        self.zones = []
+
+    def reinitialiser(self):
+        self.zones = []
+
+    def occuper(self, x, y, w, h):
+        self.zones.append((x, y, w, h))
+
+    def liberer(self, x, y, w, h):
+        self.zones.remove((x, y, w, h))
+
+    def est_libre(self, x, y, w, h):
+        for zx, zy, zw, zh in self.zones:
+            if x < zx + zw and zx < x + w and y < zy + zh and zy < y + h:
+                return False
+        return True
+
+    def fin_bloquant(self, x, y, w, h):
+        # Le bloqueur qui s'étend le plus loin vers la droite donne le saut maximal
+        meilleur_saut = -1
+        for zx, zy, zw, zh in self.zones:
+            if x < zx + zw and zx < x + w and y < zy + zh and zy < y + h:
+                if zx + zw > meilleur_saut:
+                    meilleur_saut = zx + zw
+        return meilleur_saut if meilleur_saut != -1 else None
+
+
+class OccupationBitset(IndexOccupation):
+    """ Une rangée y du conteneur est un entier dont le bit x vaut 1 si la cellule (x, y) est occupée. Les solveurs
+    balayent x à (y, h) fixés : on mémorise donc le OU des rangées [y, y+h[ (la « bande »), recalculé seulement quand
+    (y, h) change ou que l'occupation est modifiée. Un sondage coûte alors O(1) opérations sur des entiers de W bits,
+    indépendamment du nombre de rectangles placés. """
+
+    def __init__(self, largeur, hauteur):
+        super().__init__(largeur, hauteur)
+        self.rangees = [0] * hauteur
+        self._bande_y = -1
+        self._bande_h = -1
+        self._bande = 0
+
+    def reinitialiser(self):
+        self.rangees = [0] * self.hauteur
+        self._bande_y = -1
+
+    def occuper(self, x, y, w, h):
+        masque = ((1 << w) - 1) << x
+        rangees = self.rangees
+        for cy in range(y, y + h):
+            rangees[cy] |= masque
+        self._bande_y = -1
+
+    def liberer(self, x, y, w, h):
+        masque = ~(((1 << w) - 1) << x)
+        rangees = self.rangees
+        for cy in range(y, y + h):
+            rangees[cy] &= masque
+        self._bande_y = -1
+
+    def _calcule_bande(self, y, h):
+        """ Calcule et mémorise le OU des rangées [y, y+h[ (la cellule x est à 1 si elle est occupée dans l'une
+        d'elles). """
+        bande = 0
+        for rangee in self.rangees[y:y + h]:
+            bande |= rangee
+        self._bande = bande
+        self._bande_y = y
+        self._bande_h = h
+        return bande
+
+    def est_libre(self, x, y, w, h):
+        if y == self._bande_y and h == self._bande_h:
+            bande = self._bande
+        else:
+            bande = self._calcule_bande(y, h)
+        return not (bande >> x) & ((1 << w) - 1)
+
+    def fin_bloquant(self, x, y, w, h):
+        # On prend la cellule occupée la plus à droite de la fenêtre [x, x+w[ dans la bande, puis la fin de la plage
+        # occupée contiguë qui la contient : toute fenêtre commençant avant cette fin la recouvre. Le saut est donc
+        # au moins aussi long que le bord droit du bloqueur le plus lointain.
+        if y == self._bande_y and h == self._bande_h:
+            bande = self._bande
+        else:
+            bande = self._calcule_bande(y, h)
+        fenetre = bande & (((1 << w) - 1) << x)
+        if not fenetre:
+            return None
+        p = fenetre.bit_length() - 1
+        suite = bande >> p
+        return p + ((suite + 1) & ~suite).bit_length() - 1  # p + nombre de 1 consécutifs depuis p
+
+    def premier_x_libre(self, y, w, h):
+        if y == self._bande_y and h == self._bande_h:
+            bande = self._bande
+        else:
+            bande = self._calcule_bande(y, h)
+        # debuts : bit x à 1 si les cellules [x, x+long[ de la bande sont libres. On double la longueur couverte à
+        # chaque étape jusqu'à atteindre w (O(log w) opérations).
+        debuts = ~bande & ((1 << self.largeur) - 1)
+        long = 1
+        while long < w and debuts:
+            pas = min(long, w - long)
+            debuts &= debuts >> pas
+            long += pas
+        if not debuts:
+            return None
+        return (debuts & -debuts).bit_length() - 1
@@ -0,0 +1,136 @@
+""" Index des rectangles non placés, par dimensions, pour les règles de pruning de DFSSolverPRP. Répond sans parcourir
+les n rectangles restants aux questions : « aire totale tenant dans w×h », « un rectangle tient-il dans w×h » et
+« quels types de rectangles tiennent dans w×h ». """
+
+from bisect import bisect_right
+
+from utils.transposition import cle_zobrist, MASQUE_64
+
+
+class _Fenwick2D:
+    """ Arbre de Fenwick 2D sur une grille de rangs (nb_lignes × nb_colonnes), qui cumule deux valeurs par case
+    (effectif et aire) : ajout ponctuel et somme sur le rectangle de rangs [0, i[ × [0, j[ en O(log² n). """
+
+    def __init__(self, nb_lignes, nb_colonnes):
+        self.nb_lignes = nb_lignes
+        self.nb_colonnes = nb_colonnes
+        self.effectifs = [0] * ((nb_lignes + 1) * (nb_colonnes + 1))
+        self.aires = [0] * ((nb_lignes + 1) * (nb_colonnes + 1))
+
+    def ajoute(self, i, j, effectif, aire):
+        """ Ajoute (effectif, aire) à la case de rangs (i, j) (indices à partir de 0). """
+        effectifs, aires, pas = self.effectifs, self.aires, self.nb_colonnes + 1
+        i += 1
+        while i <= self.nb_lignes:
+            k = j + 1
+            while k <= self.nb_colonnes:
+                effectifs[i * pas + k] += effectif
+                aires[i * pas + k] += aire
+                k += k & -k
+            i += i & -i
+
+    @staticmethod
+    def _somme(arbre, pas, i, j):
+        total = 0
+        while i > 0:
+            k = j
+            ligne = i * pas
+            while k > 0:
+                total += arbre[ligne + k]
+                k -= k & -k
+            i -= i & -i
+        return total
+
+    def somme_effectifs(self, i, j):
+        """ Retourne l'effectif cumulé des cases de rangs [0, i[ × [0, j[. """
+        return self._somme(self.effectifs, self.nb_colonnes + 1, i, j)
+
+    def somme_aires(self, i, j):
+        """ Retourne l'aire cumulée des cases de rangs [0, i[ × [0, j[. """
+        return self._somme(self.aires, self.nb_colonnes + 1, i, j)
+
+
+class IndexRestants:
+    """ Regroupe les rectangles non placés par type (dimensions identiques). Les rectangles sont désignés par leur
+    numéro i, de dimensions largeurs[i] × hauteurs[i]. Chaque type garde une pile des numéros de ses rectangles ;
+    retirer / remettre un rectangle met à jour un arbre de Fenwick 2D (effectifs et aires) indexé par les rangs de
+    largeur et de hauteur. Les types sont numérotés par (largeur, hauteur) croissants.
+    L'empreinte du multi-ensemble restant est la somme (mod 2^64) des clés de Zobrist de ses rectangles : retirer ou
+    remettre un exemplaire retranche ou ajoute la clé de son type. """
+
+    def __init__(self, largeurs, hauteurs):
+        dimensions = sorted(set(zip(largeurs, hauteurs)))
+        self.largeurs = [w for w, _ in dimensions]  # largeur de chaque type
+        self.hauteurs = [h for _, h in dimensions]  # hauteur de chaque type
+        self.aires = [w * h for w, h in dimensions]  # aire de chaque type
+        numero = {dims: t for t, dims in enumerate(dimensions)}
+
+        # Rangs compressés des largeurs / hauteurs distinctes
+        self._largeurs_distinctes = sorted(set(self.largeurs))
+        self._hauteurs_distinctes = sorted(set(self.hauteurs))
+        rang_l = {w: i for i, w in enumerate(self._largeurs_distinctes)}
+        rang_h = {h: j for j, h in enumerate(self._hauteurs_distinctes)}
+        self._rang_l = [rang_l[w] for w in self.largeurs]
+        self._rang_h = [rang_h[h] for h in self.hauteurs]
+
+        self._cles = [cle_zobrist(w << 32 | h) for w, h in dimensions]
+        self.empreinte = 0
+
+        self.effectifs = [0] * len(dimensions)
+        self.piles = [[] for _ in dimensions]
+        self.nb_restants = 0
+        self._fenwick = _Fenwick2D(len(self._largeurs_distinctes), len(self._hauteurs_distinctes))
+
+        # Les premiers numéros sont au sommet de leur pile (retirés en premier)
+        for i in reversed(range(len(largeurs))):
+            self.remettre(numero[(largeurs[i], hauteurs[i])], i)
+
+    def representant(self, t):
+        """ Retourne le numéro du rectangle du type t qui serait retiré en premier. """
+        return self.piles[t][-1]
+
+    def retirer(self, t):
+        """ Retire un rectangle du type t et retourne son numéro (swap-out). """
+        self.effectifs[t] -= 1
+        self.nb_restants -= 1
+        self.empreinte = (self.empreinte - self._cles[t]) & MASQUE_64
+        self._fenwick.ajoute(self._rang_l[t], self._rang_h[t], -1, -self.aires[t])
+        return self.piles[t].pop()
+
+    def remettre(self, t, i):
+        """ Remet le rectangle numéro i, de type t, parmi les non placés (swap-in). """
+        self.piles[t].append(i)
+        self.effectifs[t] += 1
+        self.nb_restants += 1
+        self.empreinte = (self.empreinte + self._cles[t]) & MASQUE_64
+        self._fenwick.ajoute(self._rang_l[t], self._rang_h[t], 1, self.aires[t])
+
+    def aire_compatible(self, largeur, hauteur):
+        """ Aire totale des rectangles non placés de largeur <= largeur et de hauteur <= hauteur. """
+        return self._fenwick.somme_aires(bisect_right(self._largeurs_distinctes, largeur),
+                                         bisect_right(self._hauteurs_distinctes, hauteur))
+
+    def nb_compatibles(self, largeur, hauteur):
+        """ Nombre de rectangles non placés de largeur <= largeur et de hauteur <= hauteur. """
+        return self._fenwick.somme_effectifs(bisect_right(self._largeurs_distinctes, largeur),
+                                             bisect_right(self._hauteurs_distinctes, hauteur))
+
+    def existe_compatible(self, largeur, hauteur, type_exclu=None):
+        """ Retourne True si au moins un rectangle non placé tient dans largeur×hauteur, sans compter un exemplaire du
+        type type_exclu (le rectangle en cours de placement). """
+        nb = self.nb_compatibles(largeur, hauteur)
+        if type_exclu is not None and self.largeurs[type_exclu] <= largeur and self.hauteurs[type_exclu] <= hauteur:
+            nb -= 1
+        return nb > 0
+
+    def types_compatibles(self, largeur, hauteur):
+        """ Retourne les types ayant au moins un rectangle non placé qui tient dans largeur×hauteur, par (largeur,
+        hauteur) croissants. Le parcours s'arrête à la première largeur trop grande. """
+        types = []
+        largeurs, hauteurs, effectifs = self.largeurs, self.hauteurs, self.effectifs
+        for t in range(len(largeurs)):
+            if largeurs[t] > largeur:
+                break
+            if effectifs[t] and hauteurs[t] <= hauteur:
+                types.append(t)
+        return types
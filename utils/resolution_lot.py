@@ -0,0 +1,208 @@
+""" Résolution par lots : lit des instances une à une dans un flux JSONL, les répartit sur un groupe de processus qui
+exécutent le solveur choisi et écrit chaque résultat (JSONL) dès qu'il est connu. Seules les instances en cours sont
+en mémoire, quelle que soit la taille du fichier d'entrée.
+
+Une instance par ligne :
+    {"id": "a1", "largeur": 20, "hauteur": 15, "rectangles": [[4, 3], [2, 5], ...]}
+"hauteur" peut être omise (bande de hauteur libre : la hauteur utilisée est rapportée) ; avec --conteneur, seules les
+dimensions des rectangles comptent et le plus petit conteneur est cherché (ChercheurConteneurOptimal).
+
+Utilisation (depuis la racine du projet) :
+    python -m utils.resolution_lot instances.jsonl -o resultats.jsonl --solveur DFSSolverPRP --delai 10
+    python -m utils.resolution_lot korf.jsonl --solveur DFS --conteneur --processus 4
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing.connection import wait
+
+from models.rectangle import Rectangle
+from solvers.registre import SOLVEURS_DEMONS, classe_solveur
+from utils.conteneur_optimal import ChercheurConteneurOptimal
+
+
+def resout_instance(instance, classe, conteneur=False, ordre="decroissant", avec_placements=True):
+    """ Résout une instance (dictionnaire lu dans le flux) et retourne la ligne de résultat, sans identifiant.
+    resultat vaut True / False (emballage dans le conteneur donné) ou [largeur, hauteur] / None (recherche du
+    conteneur). Une solution est vérifiée par solveur.valide() (clé valide). Les placements sont donnés dans l'ordre
+    des rectangles de l'instance, [x, y] ou None. """
+    rectangles = [Rectangle(largeur, hauteur, i) for i, (largeur, hauteur) in enumerate(instance["rectangles"])]
+    if not rectangles:
+        raise ValueError("instance sans rectangles")
+
+    debut = time.perf_counter()
+    if conteneur:
+        chercheur = ChercheurConteneurOptimal(rectangles, classe)
+        dimensions, solveur = chercheur.trouve_conteneur_optimal(ordre=ordre)
+        ligne = {"resultat": list(dimensions) if dimensions else None}
+        statistiques = chercheur.stats
+    else:
+        if "largeur" not in instance:
+            raise ValueError("instance sans conteneur (largeur) : utiliser --conteneur")
+        hauteur = instance.get("hauteur") or sum(r.hauteur for r in rectangles)
+        solveur = classe(instance["largeur"], hauteur)
+        ligne = {"resultat": bool(solveur.emballe(rectangles, ordre=ordre))}
+        statistiques = solveur.stats
+        if ligne["resultat"]:
+            ligne["hauteur_utilisee"] = solveur.hauteur_max()
+    ligne["duree_s"] = round(time.perf_counter() - debut, 6)
+    ligne["noeuds"] = statistiques.noeuds
+    if solveur is not None and ligne["resultat"]:
+        ligne["valide"] = bool(solveur.valide())
+
+    if avec_placements and solveur is not None and ligne["resultat"]:
+        ligne["placements"] = [[r.x, r.y] if r.est_place() else None for r in rectangles]
+    return ligne
+
+
+def _travailleur(connexion, nom_solveur, conteneur, ordre, avec_placements):
+    """ Boucle d'un processus du groupe : reçoit (numero, instance), renvoie (numero, ligne), jusqu'à None. Les
+    affichages des solveurs sont jetés. Une instance invalide donne une ligne "erreur" sans arrêter le processus. """
+    classe = classe_solveur(nom_solveur)
+    with open(os.devnull, "w") as muet, contextlib.redirect_stdout(muet):
+        while True:
+            tache = connexion.recv()
+            if tache is None:
+                break
+            numero, instance = tache
+            try:
+                ligne = resout_instance(instance, classe, conteneur, ordre, avec_placements)
+                ligne = {"statut": "ok", **ligne}
+            except Exception as erreur:  # instance mal formée : signalée dans sa ligne de résultat
+                ligne = {"statut": "erreur", "erreur": f"{type(erreur).__name__}: {erreur}"}
+            connexion.send((numero, ligne))
+    connexion.close()
+
+
+class _Poste:
+    """ Un processus du groupe, son tube et l'instance qu'il traite (None s'il est libre). """
+
+    def __init__(self, contexte, parametres):
+        self.connexion, connexion_fils = contexte.Pipe()
+        self.processus = contexte.Process(target=_travailleur, args=(connexion_fils, *parametres), daemon=True)
+        self.processus.start()
+        connexion_fils.close()
+        self.tache = None  # (numero, identifiant)
+        self.echeance = None
+
+    def confie(self, numero, instance, delai):
+        self.connexion.send((numero, instance))
+        self.tache = (numero, instance.get("id", numero))
+        self.echeance = time.monotonic() + delai if delai is not None else None
+
+    def libere(self):
+        tache, self.tache, self.echeance = self.tache, None, None
+        return tache
+
+    def arrete(self, immediatement=False):
+        if not immediatement:
+            try:
+                self.connexion.send(None)
+            except (BrokenPipeError, OSError):
+                immediatement = True
+        if immediatement:
+            self.processus.terminate()
+        self.processus.join()
+        self.connexion.close()
+
+
+def traite_lot(lignes, sortie, nom_solveur, conteneur=False, nb_processus=None, delai=None, ordre="decroissant",
+               avec_placements=True):
+    """ Résout les instances JSON de l'itérable lignes (un fichier ouvert convient : il est lu au fur et à mesure) sur
+    nb_processus processus (None : tous les cœurs) et écrit une ligne JSON par instance dans sortie dès qu'elle est
+    terminée (ordre de fin, pas d'entrée). Chaque ligne porte l'identifiant ("id" de l'instance, sinon son numéro de
+    ligne), le numéro de ligne et un statut : "ok", "delai_depasse" (plus de delai secondes : le processus est arrêté
+    et remplacé) ou "erreur". Retourne le nombre de lignes par statut. """
+    if nom_solveur not in SOLVEURS_DEMONS:
+        raise ValueError(f"Solveur inconnu ou interdit dans un lot : {nom_solveur!r} "
+                         f"(attendu : {', '.join(SOLVEURS_DEMONS)})")
+    contexte = multiprocessing.get_context()
+    parametres = (nom_solveur, conteneur, ordre, avec_placements)
+    bilan = {"ok": 0, "delai_depasse": 0, "erreur": 0}
+
+    def ecrit(tache, ligne):
+        numero, identifiant = tache
+        sortie.write(json.dumps({"id": identifiant, "numero": numero, **ligne}, ensure_ascii=False) + "\n")
+        sortie.flush()
+        bilan[ligne["statut"]] += 1
+
+    entrees = enumerate(lignes, 1)
+    postes = [_Poste(contexte, parametres) for _ in range(nb_processus or os.cpu_count() or 1)]
+    epuise = False
+    try:
+        while True:
+            # Une instance par poste libre : le fichier n'est lu qu'au rythme des résolutions
+            for poste in postes:
+                while poste.tache is None and not epuise:
+                    numero, texte = next(entrees, (None, None))
+                    if numero is None:
+                        epuise = True
+                    elif texte.strip():
+                        try:
+                            instance = json.loads(texte)
+                            erreur = None if isinstance(instance, dict) else "objet JSON attendu"
+                        except json.JSONDecodeError as exception:
+                            erreur = f"JSON invalide : {exception}"
+                        if erreur:
+                            ecrit((numero, numero), {"statut": "erreur", "erreur": erreur})
+                            continue
+                        poste.confie(numero, instance, delai)
+
+            occupes = [poste for poste in postes if poste.tache is not None]
+            if not occupes:
+                break
+            echeances = [poste.echeance for poste in occupes if poste.echeance is not None]
+            attente = max(0.0, min(echeances) - time.monotonic()) if echeances else None
+            prets = wait([poste.connexion for poste in occupes], attente)
+
+            for i, poste in enumerate(postes):
+                if poste.tache is None:
+                    continue
+                if poste.connexion in prets:
+                    try:
+                        _, ligne = poste.connexion.recv()
+                        ecrit(poste.libere(), ligne)
+                        continue
+                    except EOFError:  # processus mort en cours de résolution (mémoire, signal...)
+                        ligne = {"statut": "erreur", "erreur": "processus interrompu"}
+                elif poste.echeance is not None and time.monotonic() >= poste.echeance:
+                    ligne = {"statut": "delai_depasse", "duree_s": delai}
+                else:
+                    continue
+                ecrit(poste.libere(), ligne)
+                poste.arrete(immediatement=True)
+                postes[i] = _Poste(contexte, parametres)
+    finally:
+        for poste in postes:
+            poste.arrete(immediatement=poste.tache is not None)
+    return bilan
+
+
+def main(arguments=None):
+    analyseur = argparse.ArgumentParser(prog="python -m utils.resolution_lot", description=__doc__.split("\n\n")[0])
+    analyseur.add_argument("entree", help="fichier JSONL d'instances (- : entrée standard)")
+    analyseur.add_argument("-o", "--sortie", default="-", help="fichier JSONL de résultats (- : sortie standard)")
+    analyseur.add_argument("--solveur", default="DFSSolverPRP", choices=SOLVEURS_DEMONS)
+    analyseur.add_argument("--conteneur", action="store_true", help="cherche le plus petit conteneur")
+    analyseur.add_argument("--processus", type=int, default=None, help="nombre de processus (défaut : tous)")
+    analyseur.add_argument("--delai", type=float, default=None, help="temps maximal par instance (s)")
+    analyseur.add_argument("--ordre", default="decroissant", choices=["decroissant", "croissant", "aucun"])
+    analyseur.add_argument("--sans-placements", action="store_true", help="n'écrit pas les positions")
+    args = analyseur.parse_args(arguments)
+
+    with contextlib.ExitStack() as pile:
+        entree = sys.stdin if args.entree == "-" else pile.enter_context(open(args.entree, encoding="utf-8"))
+        sortie = sys.stdout if args.sortie == "-" else pile.enter_context(open(args.sortie, "w", encoding="utf-8"))
+        bilan = traite_lot(entree, sortie, args.solveur, args.conteneur, args.processus, args.delai, args.ordre,
+                           not args.sans_placements)
+    print(", ".join(f"{statut} : {nombre}" for statut, nombre in bilan.items()), file=sys.stderr)
+    return 1 if bilan["erreur"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,27 @@
 """ Structure de données Skyline pour le Rectangle Packing. Maintient le profil supérieur des rectangles placés sous
-forme de segments horizontaux. Conçue pour être utilisée de manière incrémentale avec backtracking (DFSSolverPRP). """
+forme de segments horizontaux. Conçue pour être utilisée de manière incrémentale avec backtracking (DFSSolverPRP) :
+la liste des segments est modifiée sur place et seul le delta de chaque placement est journalisé. Les segments sont
+chaînés à leurs voisins et les vallées locales sont indexées dans un tas, mis à jour localement à chaque placement et
+annulation. """
 
+from heapq import heappush, heappop, heapify
+
+from utils.transposition import cle_zobrist
 
 class Segment:
     """ Représente un segment horizontal de la skyline.
-    Un segment (x, largeur, hauteur) signifie que la zone [x, x+largeur[ est remplie jusqu'à 'hauteur'. """
+    Un segment (x, largeur, hauteur) signifie que la zone [x, x+largeur[ est remplie jusqu'à 'hauteur'.
+    precedent / suivant sont les segments voisins (None au bord du conteneur), actif vaut True tant que le segment
+    appartient à la skyline. """
 
-    __slots__ = ('x', 'largeur', 'hauteur')
+    __slots__ = ('x', 'largeur', 'hauteur', 'precedent', 'suivant', 'actif')
     def __init__(self, x, largeur, hauteur):
         self.x = x
         self.largeur = largeur
         self.hauteur = hauteur
+        self.precedent = None
+        self.suivant = None
+        self.actif = False
 
     def x_fin(self):
         return self.x + self.largeur
@@ -26,7 +37,23 @@ class Skyline:
         self.largeur = largeur
         self.hauteur = hauteur
         self.segments = [Segment(0, largeur, 0)]
-        self._historique = []
+        self.segments[0].actif = True
+        # Tas des vallées : entrées (largeur, hauteur, x, numéro, segment). Les entrées périmées (segment retiré ou
+        # modifié, ou qui n'est plus une vallée) sont ignorées paresseusement au sommet du tas.
+        self._vallees = []
+        self._numero = 0
+        self._indexe_vallee(self.segments[0])
+        # Journal d'annulation : une entrée (indice, nb_nouveaux, anciens, empreinte) par placement, où anciens sont les
+        # segments retirés de segments[indice:indice + nb_nouveaux] (les objets eux-mêmes, sans copie) et empreinte
+        # celle du profil avant le placement
+        self._journal = []
+        self._recycles = []  # segments libérés par annuler, réutilisés par les placements suivants
+        # Empreinte de Zobrist du profil : XOR des clés de ses segments, mise à jour avec le delta de chaque placement
+        self.empreinte = self._cle_segment(self.segments[0])
+
+    def _cle_segment(self, seg):
+        """ Clé de Zobrist du segment, fonction de (x, largeur, hauteur). """
+        return cle_zobrist((seg.x * (self.largeur + 1) + seg.largeur) * (self.hauteur + 1) + seg.hauteur)
 
     def vallee(self):
         """ Retourne le segment le plus bas et plus à gauche (Bitner-Reingold), ou None si la skyline est complète. """
@@ -41,48 +68,66 @@ class Skyline:
     def vallee_plus_etroite(self):
         """ Retourne la vallée (segment plus bas que ses deux voisins) de largeur minimale parmi toutes les vallées
         (Hougardy), ou en cas d'égalité de largeur, retourne la plus basse, puis la plus à gauche. Retourne None si la
-        skyline est complète. """
+        skyline est complète. Lecture du sommet du tas des vallées : O(log n) amorti. """
         if self.est_remplie():
             return None
 
-        vallees = self._detecter_vallees()
-        if not vallees:
-            # Pas de creux local strict => on retombe sur la plus basse à gauche
-            return self.vallee()
-
-        # Tri : largeur croissante, puis hauteur croissante, puis x croissant
-        vallees.sort(key=lambda s: (s.largeur, s.hauteur, s.x))
-        return vallees[0]
+        if len(self._vallees) > 4 * len(self.segments) + 16:
+            self._reconstruit_vallees()
+        tas = self._vallees
+        while tas:
+            largeur, hauteur, x, _, seg = tas[0]
+            if seg.actif and seg.largeur == largeur and seg.hauteur == hauteur and seg.x == x and self._est_vallee(seg):
+                return seg
+            heappop(tas)  # entrée périmée
+
+        # Pas de creux local strict => on retombe sur la plus basse à gauche
+        return self.vallee()
+
+    def _est_vallee(self, seg):
+        """ Un segment est une vallée s'il est plus bas que ses deux voisins (le bord du conteneur compte comme un
+        voisin de hauteur maximale) et n'est pas plein. """
+        h = seg.hauteur
+        if h == self.hauteur:
+            return False
+        if seg.precedent is not None and seg.precedent.hauteur <= h:
+            return False
+        if seg.suivant is not None and seg.suivant.hauteur <= h:
+            return False
+        return True
+
+    def _indexe_vallee(self, seg):
+        """ Ajoute le segment au tas des vallées s'il en est une. """
+        if seg is not None and self._est_vallee(seg):
+            self._numero += 1
+            heappush(self._vallees, (seg.largeur, seg.hauteur, seg.x, self._numero, seg))
+
+    def _reconstruit_vallees(self):
+        """ Reconstruit le tas à partir des seules vallées courantes (purge des entrées périmées). """
+        self._vallees = []
+        for seg in self._detecter_vallees():
+            self._numero += 1
+            self._vallees.append((seg.largeur, seg.hauteur, seg.x, self._numero, seg))
+        heapify(self._vallees)
 
     def _detecter_vallees(self):
         """ Retourne tous les segments qui sont des vallées locales (plus bas que leurs voisins).
         Un segment de bord (premier ou dernier) est considéré vallée si son unique voisin est plus haut. """
-        vallees = []
-        n = len(self.segments)
-        for i, seg in enumerate(self.segments):
-            if seg.hauteur == self.hauteur:
-                continue  # segment plein => pas une vallée
-            h_gauche = self.segments[i - 1].hauteur if i > 0     else self.hauteur
-            h_droite = self.segments[i + 1].hauteur if i < n - 1 else self.hauteur
-            if seg.hauteur < h_gauche and seg.hauteur < h_droite:
-                vallees.append(seg)
-        return vallees
+        return [seg for seg in self.segments if self._est_vallee(seg)]
 
     def hauteur_plafond(self, vallee):
         """ Retourne la hauteur du plafond de la vallée = min(h_voisin_gauche, h_voisin_droit).
         C'est la hauteur jusqu'à laquelle la vallée doit être remplie au minimum.
-        Utilisée pour la Règle 1 de Hougardy (valley area check). """
-        n = len(self.segments)
-        for i, seg in enumerate(self.segments):
-            if seg is vallee:
-                h_gauche = self.segments[i - 1].hauteur if i > 0     else self.hauteur
-                h_droite = self.segments[i + 1].hauteur if i < n - 1 else self.hauteur
-                return min(h_gauche, h_droite)
-        return self.hauteur
+        Utilisée pour la Règle 1 de Hougardy (valley area check). Lecture directe des voisins : O(1). """
+        h_gauche = vallee.precedent.hauteur if vallee.precedent is not None else self.hauteur
+        h_droite = vallee.suivant.hauteur if vallee.suivant is not None else self.hauteur
+        return min(h_gauche, h_droite)
 
     def largeur_disponible(self, x_v, h_v):
         """ Retourne la largeur totale disponible à partir de (x_v, h_v).
-        S'étend vers la droite tant que les segments adjacents sont à la même hauteur h_v. """
+        S'étend vers la droite tant que les segments adjacents sont à la même hauteur h_v. Les segments adjacents de
+        même hauteur étant toujours fusionnés, la largeur disponible au début d'un segment est sa largeur : les
+        appelants qui tiennent déjà le segment lisent directement seg.largeur (O(1)). """
         total = 0
         for seg in self.segments:
             if seg.x >= x_v and seg.hauteur == h_v:
@@ -96,46 +141,109 @@ class Skyline:
         return len(self.segments) == 1 and self.segments[0].hauteur == self.hauteur
 
 
-    def mettre_a_jour(self, rect):
-        """ Met à jour la skyline après le placement de rect. """
-        self._historique.append([Segment(s.x, s.largeur, s.hauteur) for s in self.segments])
-
-        x_debut = rect.x
-        x_fin   = rect.x + rect.largeur
-        h_new   = rect.y + rect.hauteur
-
-        nouveaux = []
-        for seg in self.segments:
-            if seg.x_fin() <= x_debut or seg.x >= x_fin:
-                nouveaux.append(Segment(seg.x, seg.largeur, seg.hauteur))
-            else:
-                if seg.x < x_debut:
-                    nouveaux.append(Segment(seg.x, x_debut - seg.x, seg.hauteur))
-                overlap_x   = max(seg.x, x_debut)
-                overlap_fin = min(seg.x_fin(), x_fin)
-                nouveaux.append(Segment(overlap_x, overlap_fin - overlap_x, h_new))
-                if seg.x_fin() > x_fin:
-                    nouveaux.append(Segment(x_fin, seg.x_fin() - x_fin, seg.hauteur))
-
-        self.segments = self._fusionner(nouveaux)
+    def _segment(self, x, largeur, hauteur):
+        """ Retourne un segment (recyclé si possible) initialisé aux valeurs données. """
+        if self._recycles:
+            seg = self._recycles.pop()
+            seg.x = x
+            seg.largeur = largeur
+            seg.hauteur = hauteur
+            return seg
+        return Segment(x, largeur, hauteur)
+
+    def mettre_a_jour(self, x, y, largeur, hauteur):
+        """ Met à jour la skyline après le placement d'un rectangle largeur×hauteur en (x, y). Seuls les segments
+        couverts par le rectangle (et ses voisins fusionnés) sont remplacés, et le journal ne retient que ce delta. """
+        segments = self.segments
+        x_debut = x
+        x_fin   = x + largeur
+        h_new   = y + hauteur
+
+        # Segments [debut, fin[ recouverts par le rectangle
+        debut = 0
+        while segments[debut].x + segments[debut].largeur <= x_debut:
+            debut += 1
+        fin = debut
+        while fin < len(segments) and segments[fin].x < x_fin:
+            fin += 1
+
+        premier = segments[debut]
+        dernier = segments[fin - 1]
+        x_milieu, x_fin_milieu = x_debut, x_fin
+
+        # Débords à gauche / à droite du rectangle : ils gardent leur hauteur. Sinon, le segment voisin de même
+        # hauteur est absorbé (fusion), ce qui garde la skyline sans segments adjacents de même hauteur.
+        gauche = droite = None
+        if premier.x < x_debut and premier.hauteur != h_new:
+            gauche = self._segment(premier.x, x_debut - premier.x, premier.hauteur)
+        elif premier.x < x_debut:
+            x_milieu = premier.x
+        elif debut > 0 and segments[debut - 1].hauteur == h_new:
+            debut -= 1
+            x_milieu = segments[debut].x
+        if dernier.x + dernier.largeur > x_fin and dernier.hauteur != h_new:
+            droite = self._segment(x_fin, dernier.x + dernier.largeur - x_fin, dernier.hauteur)
+        elif dernier.x + dernier.largeur > x_fin:
+            x_fin_milieu = dernier.x + dernier.largeur
+        elif fin < len(segments) and segments[fin].hauteur == h_new:
+            x_fin_milieu = segments[fin].x + segments[fin].largeur
+            fin += 1
+
+        milieu = self._segment(x_milieu, x_fin_milieu - x_milieu, h_new)
+        if gauche is None and droite is None:
+            nouveaux = (milieu,)
+        elif gauche is None:
+            nouveaux = (milieu, droite)
+        elif droite is None:
+            nouveaux = (gauche, milieu)
+        else:
+            nouveaux = (gauche, milieu, droite)
+
+        anciens = segments[debut:fin]
+        self._journal.append((debut, len(nouveaux), anciens, self.empreinte))
+        empreinte = self.empreinte
+        for seg in anciens:
+            empreinte ^= self._cle_segment(seg)
+        for seg in nouveaux:
+            empreinte ^= self._cle_segment(seg)
+        self.empreinte = empreinte
+        segments[debut:fin] = nouveaux
+        for seg in anciens:
+            seg.actif = False
+        self._raccorde(debut, nouveaux)
 
     def annuler(self):
-        """ Restaure la skyline à l'état avant le dernier mettre_a_jour (UNDO). """
-        self.segments = self._historique.pop()
-
-
-    @staticmethod
-    def _fusionner(segments):
-        """ Fusionne les segments adjacents de même hauteur. """
-        if not segments:
-            return segments
-        fusionne = [Segment(segments[0].x, segments[0].largeur, segments[0].hauteur)]
-        for seg in segments[1:]:
-            if seg.hauteur == fusionne[-1].hauteur:
-                fusionne[-1].largeur += seg.largeur
-            else:
-                fusionne.append(Segment(seg.x, seg.largeur, seg.hauteur))
-        return fusionne
+        """ Restaure la skyline à l'état avant le dernier mettre_a_jour (UNDO) en rejouant le delta à l'envers. """
+        debut, nb_nouveaux, anciens, self.empreinte = self._journal.pop()
+        segments = self.segments
+        for seg in segments[debut:debut + nb_nouveaux]:
+            seg.actif = False
+            self._recycles.append(seg)
+        segments[debut:debut + nb_nouveaux] = anciens
+        self._raccorde(debut, anciens)
+
+    def _raccorde(self, debut, inseres):
+        """ Chaîne les segments insérés à segments[debut:] avec leurs voisins et ré-indexe les vallées de la zone
+        modifiée : seuls ces segments et leurs deux voisins peuvent avoir changé de statut. """
+        segments = self.segments
+        fin = debut + len(inseres)
+        precedent = segments[debut - 1] if debut > 0 else None
+        suivant = segments[fin] if fin < len(segments) else None
+
+        for seg in inseres:
+            seg.actif = True
+            seg.precedent = precedent
+            if precedent is not None:
+                precedent.suivant = seg
+            precedent = seg
+        precedent.suivant = suivant
+        if suivant is not None:
+            suivant.precedent = precedent
+
+        self._indexe_vallee(segments[debut - 1] if debut > 0 else None)
+        for seg in inseres:
+            self._indexe_vallee(seg)
+        self._indexe_vallee(suivant)
 
     def affiche(self):
         print(f"Skyline ({len(self.segments)} segments) : {self.segments}")
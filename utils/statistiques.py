@@ -0,0 +1,143 @@
+""" Statistiques de résolution communes à tous les solveurs : compteurs, temps par règle, histogramme des profondeurs
+d'élagage et rappel de progression. """
+
+import math
+import time
+
+
+class Statistiques:
+    """ Compteurs d'une résolution, remplis de la même façon par tous les solveurs :
+        - noeuds    : nœuds explorés (DFS) ou rectangles traités (Bottom-Left)
+        - elagages  : nombre d'élagages par règle ; un élagage coupe un nœud, ou une branche pour les règles de
+                      regles_branche (appliquées à un fils avant qu'il ne soit compté comme nœud)
+        - compteurs : autres compteurs propres au solveur (positions écartées par la symétrie, sondages...), qui
+                      n'entrent pas dans le taux d'élagage
+        - duree_s   : temps de calcul de la dernière résolution
+    Options, désactivées par défaut (rien n'est alors installé sur le chemin chaud) :
+        - chronometre : temps cumulé par règle (temps), en enveloppant les méthodes REGLES_CHRONOMETREES du solveur
+        - profondeurs : histogramme, par règle, des profondeurs où les élagages ont lieu (histogramme)
+        - rappel      : fonction appelée avec ces statistiques tous les periode_rappel nœuds """
+
+    def __init__(self, regles_branche=(), chronometre=False, profondeurs=False, rappel=None, periode_rappel=10_000):
+        self.regles_branche = tuple(regles_branche)
+        self.chronometre = chronometre
+        self.profondeurs = profondeurs
+        self.rappel = rappel
+        self.periode_rappel = periode_rappel
+        self.temps = {}
+        self.histogramme = {}
+        self.reinitialise()
+
+    def reinitialise(self):
+        """ Remet les compteurs à zéro, en gardant les options (et les enveloppes installées). """
+        self.noeuds = 0
+        self.elagages = {}
+        self.compteurs = {}
+        self.duree_s = 0.0
+        self.temps.clear()
+        self.histogramme.clear()
+        self.prochain_rappel = self.periode_rappel if self.rappel is not None else math.inf
+
+    # Chemin chaud
+    def elague(self, regle, profondeur):
+        """ Compte un élagage de la règle à la profondeur donnée (nombre de rectangles placés). """
+        self.elagages[regle] = self.elagages.get(regle, 0) + 1
+        if self.profondeurs:
+            histogramme = self.histogramme.setdefault(regle, [])
+            if len(histogramme) <= profondeur:
+                histogramme.extend([0] * (profondeur + 1 - len(histogramme)))
+            histogramme[profondeur] += 1
+
+    def compte(self, nom, valeur=1):
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + valeur
+
+    def signale(self):
+        """ Appelle le rappel de progression et fixe le seuil du suivant. Le solveur l'appelle quand noeuds atteint
+        prochain_rappel (infini sans rappel : une seule comparaison par nœud). """
+        self.prochain_rappel = self.noeuds + self.periode_rappel
+        self.rappel(self)
+
+    # Chronométrage par règle
+    def instrumente(self, solveur):
+        """ Enveloppe les méthodes de solveur.REGLES_CHRONOMETREES ({règle: nom de méthode}) pour cumuler leur temps
+        dans temps[règle]. Les enveloppes sont des attributs d'instance, qui masquent les méthodes de la classe. """
+        self.desinstrumente(solveur)
+        for regle, nom in solveur.REGLES_CHRONOMETREES.items():
+            setattr(solveur, nom, self._enveloppe(regle, getattr(solveur, nom)))
+
+    @staticmethod
+    def desinstrumente(solveur):
+        for nom in solveur.REGLES_CHRONOMETREES.values():
+            solveur.__dict__.pop(nom, None)
+
+    def _enveloppe(self, regle, methode):
+        temps = self.temps
+        horloge = time.perf_counter
+
+        def chronometree(*args):
+            debut = horloge()
+            try:
+                return methode(*args)
+            finally:
+                temps[regle] = temps.get(regle, 0.0) + horloge() - debut
+        return chronometree
+
+    # Lecture
+    def total_elagages(self):
+        return sum(self.elagages.values())
+
+    def taux_elagage(self):
+        """ Part des sous-arbres rencontrés qui ont été coupés : élagages / (nœuds + branches coupées avant d'être
+        comptées comme nœuds). Toujours <= 1. """
+        evalues = self.noeuds + sum(self.elagages.get(regle, 0) for regle in self.regles_branche)
+        return self.total_elagages() / evalues if evalues else 0.0
+
+    def noeuds_par_s(self):
+        return self.noeuds / self.duree_s if self.duree_s > 0 else 0.0
+
+    def vers_dict(self):
+        """ Statistiques sous forme de données (sérialisables en JSON / pickle). """
+        return {
+            "noeuds": self.noeuds,
+            "elagages": dict(self.elagages),
+            "compteurs": dict(self.compteurs),
+            "duree_s": self.duree_s,
+            "temps": dict(self.temps),
+            "histogramme": {regle: list(h) for regle, h in self.histogramme.items()},
+        }
+
+    def charge(self, donnees):
+        """ Remplace les compteurs par ceux de donnees (produites par vers_dict). """
+        self.reinitialise()
+        self.cumule(donnees)
+        self.duree_s = donnees.get("duree_s", 0.0)
+
+    def cumule(self, donnees):
+        """ Ajoute les compteurs de donnees (produites par vers_dict, par exemple dans un autre processus). La durée
+        n'est pas cumulée : elle reste celle mesurée par l'appelant. """
+        self.noeuds += donnees.get("noeuds", 0)
+        for regle, nombre in donnees.get("elagages", {}).items():
+            self.elagages[regle] = self.elagages.get(regle, 0) + nombre
+        for nom, valeur in donnees.get("compteurs", {}).items():
+            self.compte(nom, valeur)
+        for regle, duree in donnees.get("temps", {}).items():
+            self.temps[regle] = self.temps.get(regle, 0.0) + duree
+        for regle, histogramme in donnees.get("histogramme", {}).items():
+            cumul = self.histogramme.setdefault(regle, [])
+            if len(cumul) < len(histogramme):
+                cumul.extend([0] * (len(histogramme) - len(cumul)))
+            for profondeur, nombre in enumerate(histogramme):
+                cumul[profondeur] += nombre
+
+    def affiche(self):
+        print(f"        Noeuds explorés          : {self.noeuds} ({self.noeuds_par_s():.0f}/s)")
+        for regle, nombre in sorted(self.elagages.items()):
+            print(f"        Élagages {regle:<16}: {nombre}")
+        for nom, valeur in sorted(self.compteurs.items()):
+            print(f"        {nom:<25}: {valeur}")
+        if self.noeuds:
+            print(f"        Taux d'élagage           : {100 * self.taux_elagage():.1f}%")
+        for regle, duree in sorted(self.temps.items(), key=lambda e: -e[1]):
+            print(f"        Temps {regle:<19}: {duree:.3f}s")
+        for regle, histogramme in sorted(self.histogramme.items()):
+            print(f"        Profondeurs {regle:<13}: {histogramme}")
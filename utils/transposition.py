@@ -0,0 +1,112 @@
+""" Table de transposition bornée des états déjà prouvés irréalisables, et clés de Zobrist pour les indexer. Un état
+de recherche est résumé par une empreinte entière maintenue incrémentalement par le solveur ; retrouver l'empreinte
+dans la table permet de couper la branche sans la ré-explorer. """
+
+import random
+import sys
+from collections import OrderedDict
+
+MASQUE_64 = (1 << 64) - 1
+PREMIER_61 = (1 << 61) - 1  # nombre premier de Mersenne 2^61 - 1
+
+
+def cle_zobrist(valeur):
+    """ Mélange un entier en une clé pseudo-aléatoire de 64 bits (splitmix64). Tient lieu de table de Zobrist pour des
+    clés trop nombreuses pour être tabulées (ex : segments (x, largeur, hauteur)). """
+    z = (valeur + 0x9E3779B97F4A7C15) & MASQUE_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASQUE_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASQUE_64
+    return z ^ (z >> 31)
+
+
+class EmpreinteRegion:
+    """ Empreinte d'une région du conteneur (union de rectangles disjoints), indépendante de l'ordre et du découpage
+    des rectangles qui la composent. Chaque cellule (x, y) pèse a(x)·b(y) modulo 2^61 - 1, avec a et b aléatoires ;
+    grâce aux sommes préfixes, ajouter ou retirer un rectangle coûte O(1). Deux couples (a, b) indépendants rendent
+    la probabilité de collision négligeable (~ 2^-120 par paire de régions). """
+
+    def __init__(self, largeur, hauteur, graine=0):
+        rng = random.Random(graine)
+        self._prefixes = []
+        for _ in range(2):
+            px, py = [0], [0]
+            for _ in range(largeur):
+                px.append((px[-1] + rng.randrange(1, PREMIER_61)) % PREMIER_61)
+            for _ in range(hauteur):
+                py.append((py[-1] + rng.randrange(1, PREMIER_61)) % PREMIER_61)
+            self._prefixes.append((px, py))
+        self.h1 = 0
+        self.h2 = 0
+
+    def reinitialiser(self):
+        self.h1 = 0
+        self.h2 = 0
+
+    def ajoute(self, x, y, w, h):
+        """ Ajoute la zone [x, x+w[ × [y, y+h[ (supposée libre) à la région. """
+        (px1, py1), (px2, py2) = self._prefixes
+        self.h1 = (self.h1 + (px1[x + w] - px1[x]) * (py1[y + h] - py1[y])) % PREMIER_61
+        self.h2 = (self.h2 + (px2[x + w] - px2[x]) * (py2[y + h] - py2[y])) % PREMIER_61
+
+    def retire(self, x, y, w, h):
+        """ Retire la zone [x, x+w[ × [y, y+h[ de la région. """
+        (px1, py1), (px2, py2) = self._prefixes
+        self.h1 = (self.h1 - (px1[x + w] - px1[x]) * (py1[y + h] - py1[y])) % PREMIER_61
+        self.h2 = (self.h2 - (px2[x + w] - px2[x]) * (py2[y + h] - py2[y])) % PREMIER_61
+
+    def valeur(self):
+        """ Retourne l'empreinte courante (entier de 122 bits). """
+        return self.h1 << 61 | self.h2
+
+
+class TableTransposition:
+    """ Ensemble borné d'empreintes d'états irréalisables, avec éviction LRU : une empreinte retrouvée redevient la
+    plus récente, et la plus ancienne est évincée quand la capacité (en nombre d'entrées) est atteinte. """
+
+    def __init__(self, capacite):
+        self.capacite = capacite
+        self._etats = OrderedDict()
+        self.succes = 0
+        self.echecs = 0
+        self.insertions = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._etats)
+
+    def contient(self, empreinte):
+        """ Retourne True si l'état est connu comme irréalisable (et le marque comme récemment utilisé). """
+        if empreinte in self._etats:
+            self._etats.move_to_end(empreinte)
+            self.succes += 1
+            return True
+        self.echecs += 1
+        return False
+
+    def ajoute(self, empreinte):
+        """ Enregistre un état prouvé irréalisable. """
+        if self.capacite <= 0:
+            return
+        self._etats[empreinte] = None
+        self.insertions += 1
+        if len(self._etats) > self.capacite:
+            self._etats.popitem(last=False)
+            self.evictions += 1
+
+    def taux_succes(self):
+        """ Proportion des consultations ayant trouvé l'état dans la table. """
+        total = self.succes + self.echecs
+        return self.succes / total if total else 0.0
+
+    def memoire(self):
+        """ Estimation de la mémoire occupée (octets) : la table et ses empreintes. """
+        taille = sys.getsizeof(self._etats)
+        if self._etats:
+            taille += len(self._etats) * sys.getsizeof(next(iter(self._etats)))
+        return taille
+
+    def affiche_stats(self):
+        print(f"        Table de transposition   : {len(self)}/{self.capacite} entrées, "
+              f"~{self.memoire() / 1024 ** 2:.1f} Mo")
+        print(f"        Succès / échecs          : {self.succes} / {self.echecs} "
+              f"({100 * self.taux_succes():.1f}%), {self.evictions} évictions")
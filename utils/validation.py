@@ -0,0 +1,132 @@
+""" Validation d'un placement en O(n log n) : rectangles tous placés, à l'intérieur du conteneur, sans chevauchement
+et, pour le Perfect Rectangle Packing, couvrant exactement le conteneur. Les chevauchements sont trouvés par balayage
+selon x ; les rectangles actifs (traversés par la ligne de balayage) sont rangés dans un arbre de segments indexé par
+rang de y, qui garde le haut maximal de chaque sous-arbre. """
+
+from bisect import bisect_left
+
+
+class RapportValidation:
+    """ Résultat d'une validation. Vrai (bool) si le placement est valide.
+        - non_places     : rectangles sans position
+        - hors_limites   : rectangles qui dépassent du conteneur (ou de dimensions non positives)
+        - chevauchements : paires (r1, r2) de rectangles qui se chevauchent (au plus max_paires)
+        - aire_couverte  : somme des aires des rectangles placés (égale à l'aire couverte s'il n'y a pas de
+                           chevauchement) ; comparée à aire_conteneur si la couverture exacte est demandée """
+
+    def __init__(self, aire_conteneur, parfait):
+        self.aire_conteneur = aire_conteneur
+        self.parfait = parfait
+        self.non_places = []
+        self.hors_limites = []
+        self.chevauchements = []
+        self.aire_couverte = 0
+
+    def couverture_exacte(self):
+        return self.aire_couverte == self.aire_conteneur and not self.chevauchements and not self.hors_limites
+
+    def __bool__(self):
+        if self.non_places or self.hors_limites or self.chevauchements:
+            return False
+        return self.couverture_exacte() if self.parfait else True
+
+    def erreurs(self):
+        """ Retourne la liste des erreurs, en texte. """
+        messages = [f"rectangle {r.id} non placé" for r in self.non_places]
+        messages += [f"rectangle {r.id} hors du conteneur : {r}" for r in self.hors_limites]
+        messages += [f"chevauchement entre rect {r1.id} et {r2.id}" for r1, r2 in self.chevauchements]
+        if self.parfait and self.aire_couverte != self.aire_conteneur:
+            messages.append(f"aire totale {self.aire_couverte} != aire conteneur {self.aire_conteneur}")
+        return messages
+
+
+class _ArbreHauts:
+    """ Arbre de segments sur les rangs des rectangles (triés par y) : la feuille d'un rectangle actif vaut son haut
+    (y + hauteur), celle d'un rectangle inactif -1 ; chaque nœud garde le maximum de ses feuilles. """
+
+    def __init__(self, nb):
+        self.taille = 1
+        while self.taille < nb:
+            self.taille *= 2
+        self.maxima = [-1] * (2 * self.taille)
+
+    def affecte(self, rang, valeur):
+        noeud = self.taille + rang
+        maxima = self.maxima
+        maxima[noeud] = valeur
+        noeud //= 2
+        while noeud:
+            maxima[noeud] = max(maxima[2 * noeud], maxima[2 * noeud + 1])
+            noeud //= 2
+
+    def depassant(self, limite_rang, seuil):
+        """ Retourne les rangs < limite_rang dont la valeur dépasse strictement seuil, en ne descendant que dans les
+        sous-arbres qui en contiennent : O((k + 1) log n) pour k rangs retournés. """
+        rangs = []
+        maxima, taille = self.maxima, self.taille
+        pile = [(1, 0, taille)]
+        while pile:
+            noeud, debut, fin = pile.pop()
+            if debut >= limite_rang or maxima[noeud] <= seuil:
+                continue
+            if noeud >= taille:
+                rangs.append(debut)
+            else:
+                milieu = (debut + fin) // 2
+                pile.append((2 * noeud + 1, milieu, fin))
+                pile.append((2 * noeud, debut, milieu))
+        return rangs
+
+
+def valide_placement(rectangles, largeur, hauteur, parfait=False, max_paires=100):
+    """ Valide la position des rectangles dans le conteneur largeur × hauteur. parfait : exige en plus que les
+    rectangles couvrent exactement le conteneur (Perfect Rectangle Packing). La recherche des chevauchements s'arrête
+    après max_paires paires (None : toutes). Retourne un RapportValidation. """
+    rapport = RapportValidation(largeur * hauteur, parfait)
+    places = []
+    for r in rectangles:
+        if not r.est_place():
+            rapport.non_places.append(r)
+            continue
+        if r.largeur <= 0 or r.hauteur <= 0 or r.x < 0 or r.y < 0 or r.x + r.largeur > largeur \
+                or r.y + r.hauteur > hauteur:
+            rapport.hors_limites.append(r)
+        if r.largeur > 0 and r.hauteur > 0:
+            places.append(r)
+        rapport.aire_couverte += r.aire()
+
+    rapport.chevauchements = chevauchements(places, max_paires)
+    return rapport
+
+
+def chevauchements(rectangles, max_paires=None):
+    """ Retourne les paires de rectangles placés (de dimensions positives) qui se chevauchent, au plus max_paires.
+    Balayage selon x : à chaque abscisse, les rectangles qui se terminent quittent l'ensemble actif avant que ceux qui
+    commencent n'y entrent (deux rectangles qui se touchent ne se chevauchent pas) ; un rectangle qui entre chevauche
+    les rectangles actifs de y < son haut dont le haut dépasse son y. """
+    par_y = sorted(range(len(rectangles)), key=lambda i: rectangles[i].y)
+    ys = [rectangles[i].y for i in par_y]
+    rang = [0] * len(rectangles)
+    for r, i in enumerate(par_y):
+        rang[i] = r
+
+    # Événements (abscisse, 0 = sortie / 1 = entrée, numéro)
+    evenements = []
+    for i, r in enumerate(rectangles):
+        evenements.append((r.x, 1, i))
+        evenements.append((r.x + r.largeur, 0, i))
+    evenements.sort()
+
+    arbre = _ArbreHauts(len(rectangles))
+    paires = []
+    for _, entree, i in evenements:
+        if not entree:
+            arbre.affecte(rang[i], -1)
+            continue
+        r = rectangles[i]
+        for autre in arbre.depassant(bisect_left(ys, r.y + r.hauteur), r.y):
+            paires.append((rectangles[par_y[autre]], r))
+            if max_paires is not None and len(paires) >= max_paires:
+                return paires
+        arbre.affecte(rang[i], r.y + r.hauteur)
+    return paires
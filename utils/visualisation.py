@@ -1,60 +1,136 @@
-""" Utilitaire de visualisation des solutions provenant d'un solveur. """
+""" Utilitaire de visualisation des solutions provenant d'un solveur : affichage interactif, ou export PNG / SVG sans
+interface graphique (fichier ou tampon), éventuellement sur plusieurs processus. """
 
-import random
+import multiprocessing
 import numpy as np
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
 
+SEUIL_ETIQUETTES = 200  # au-delà, les numéros des rectangles ne sont plus écrits (illisibles)
+SEUIL_RASTER = 20_000  # au-delà, les rectangles sont peints dans une image plutôt que tracés un à un
+PIXELS_MAX = 4_000_000  # taille maximale (en cases) du conteneur pour le rendu en image
+GRADUATIONS_MAX = 40  # au-delà, les graduations ne sont plus placées à chaque entier
 
-def visualise_solution(solveur, titre="Rectangle Packing"):
-    fig, ax = plt.subplots(1, 1, figsize=(12, 10))
+
+def donnees_solution(solveur):
+    """ Extrait d'un solveur les données nécessaires au rendu (sérialisables, à passer à exporte_solutions) :
+    dimensions du conteneur et rectangles placés (id, x, y, largeur, hauteur). """
+    return {
+        "largeur": solveur.largeur_conteneur,
+        "hauteur": solveur.hauteur_conteneur,
+        "rectangles": [(r.id, r.x, r.y, r.largeur, r.hauteur) for r in solveur.rectangles_places if r.est_place()],
+    }
+
+
+def _dessine(ax, donnees, titre, etiquettes=None, mode="auto"):
+    """ Dessine la solution dans ax. Les rectangles forment une seule collection de polygones (mode "vecteur") ou
+    sont peints dans une image (mode "raster", choisi par "auto" pour les très grands placements). etiquettes :
+    numéros des rectangles (None : seulement s'il y en a au plus SEUIL_ETIQUETTES). """
+    largeur, hauteur, rects = donnees["largeur"], donnees["hauteur"], donnees["rectangles"]
 
     # Bounding box réellement utilisé
-    largeur_utilisee = solveur.largeur_max()
-    hauteur_utilisee = solveur.hauteur_max()
+    largeur_utilisee = max((x + w for _, x, _, w, _ in rects), default=0)
+    hauteur_utilisee = max((y + h for _, _, y, _, h in rects), default=0)
+    largeur_axe = max(largeur, largeur_utilisee)
+    hauteur_axe = max(hauteur, hauteur_utilisee)
 
-    bbox = patches.Rectangle((0, 0), largeur_utilisee, hauteur_utilisee,
-                              linewidth=2, edgecolor='red', facecolor='none', label='Conteneur')
+    bbox = patches.Rectangle((0, 0), largeur_utilisee, hauteur_utilisee, linewidth=2, edgecolor='red',
+                             facecolor='none', label='Conteneur', zorder=3)
     ax.add_patch(bbox)
 
-    # Dessine les rectangles placés
-    couleurs = [(random.random(), random.random(), random.random(), 0.7)
-                for _ in solveur.rectangles_places]
+    # Dessine les rectangles placés (couleurs reproductibles d'un rendu à l'autre)
+    if rects:
+        couleurs = np.random.default_rng(0).random((len(rects), 4))
+        couleurs[:, 3] = 0.7
+        positions = np.array([r[1:] for r in rects])  # colonnes x, y, largeur, hauteur
 
-    for rect, couleur in zip(solveur.rectangles_places, couleurs):
-        if rect.est_place():
-            patch = patches.Rectangle((rect.x, rect.y), rect.largeur, rect.hauteur,
-                                       linewidth=1, edgecolor='black', facecolor=couleur)
-            ax.add_patch(patch)
+        if mode == "auto":
+            mode = "raster" if len(rects) > SEUIL_RASTER and largeur_axe * hauteur_axe <= PIXELS_MAX else "vecteur"
+        if mode == "raster":
+            image = np.zeros((hauteur_axe, largeur_axe, 4), dtype=np.uint8)
+            couleurs_octets = (couleurs * 255).astype(np.uint8)
+            for (x, y, w, h), couleur in zip(positions, couleurs_octets):
+                image[y:y + h, x:x + w] = couleur
+            ax.imshow(image, origin='lower', extent=(0, largeur_axe, 0, hauteur_axe), interpolation='nearest')
+        else:
+            x, y, w, h = positions.T
+            sommets = np.stack([np.column_stack((x, y)), np.column_stack((x + w, y)),
+                                np.column_stack((x + w, y + h)), np.column_stack((x, y + h))], axis=1)
+            ax.add_collection(PolyCollection(sommets, facecolors=couleurs, edgecolors='black',
+                                             linewidths=1 if len(rects) <= 2000 else 0.2))
 
-            cx = rect.x + rect.largeur / 2
-            cy = rect.y + rect.hauteur / 2
-            ax.text(cx, cy, str(rect.id), ha='center', va='center',
-                    fontsize=10, fontweight='bold')
+        if etiquettes is None:
+            etiquettes = len(rects) <= SEUIL_ETIQUETTES
+        if etiquettes:
+            taille = 10 if len(rects) <= 50 else 6
+            for id_rect, x, y, w, h in rects:
+                ax.text(x + w / 2, y + h / 2, str(id_rect), ha='center', va='center', fontsize=taille,
+                        fontweight='bold')
 
-    # Axes
-    ax.set_xlim(-1, max(solveur.largeur_conteneur, largeur_utilisee) + 1)
-    ax.set_ylim(-1, max(solveur.hauteur_conteneur, hauteur_utilisee) + 1)
+    # Axes : une graduation par entier pour les petits conteneurs, une vingtaine au plus sinon
+    ax.set_xlim(-1, largeur_axe + 1)
+    ax.set_ylim(-1, hauteur_axe + 1)
     ax.set_aspect('equal')
     ax.set_xlabel('X', fontsize=12)
     ax.set_ylabel('Y', fontsize=12)
     ax.set_title(titre, fontsize=14, fontweight='bold')
-    ax.set_xticks(np.arange(0, max(solveur.largeur_conteneur, largeur_utilisee) + 1, 1))
-    ax.set_yticks(np.arange(0, max(solveur.hauteur_conteneur, hauteur_utilisee) + 1, 1))
+    for axe, dimension in ((ax.xaxis, largeur_axe), (ax.yaxis, hauteur_axe)):
+        if dimension <= GRADUATIONS_MAX:
+            axe.set_ticks(np.arange(0, dimension + 1, 1))
+        else:
+            axe.set_major_locator(MaxNLocator(nbins=20, integer=True))
     ax.grid(True, alpha=0.3)
     ax.legend(loc='upper right')
 
     # Statistiques
-    aire_utilisee = sum(r.aire() for r in solveur.rectangles_places)
-    espace_perdu = solveur.largeur_conteneur * solveur.hauteur_conteneur - aire_utilisee
+    aire_utilisee = sum(w * h for _, _, _, w, h in rects)
+    espace_perdu = largeur * hauteur - aire_utilisee
 
-    stats_text = (f"Conteneur : {solveur.largeur_conteneur}×{solveur.hauteur_conteneur} "
-                  f"(aire = {solveur.largeur_conteneur * solveur.hauteur_conteneur})\n"
+    stats_text = (f"Conteneur : {largeur}×{hauteur} "
+                  f"(aire = {largeur * hauteur})\n"
                   f"Gaspillage conteneur : {espace_perdu}")
 
     ax.text(0.02, 0.98, stats_text, transform=ax.transAxes,
             fontsize=10, verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.9))
 
+
+def exporte_solution(donnees, fichier, titre="Rectangle Packing", format=None, dpi=100, etiquettes=None,
+                     mode="auto"):
+    """ Écrit le rendu des données (voir donnees_solution) dans fichier, chemin ou tampon binaire (io.BytesIO...).
+    format : "png", "svg"... (par défaut, déduit de l'extension du chemin). N'utilise pas pyplot : aucune fenêtre,
+    aucun état global, utilisable dans un processus sans affichage. """
+    fig = Figure(figsize=(12, 10))
+    _dessine(fig.subplots(1, 1), donnees, titre, etiquettes, mode)
+    fig.tight_layout()
+    fig.savefig(fichier, format=format, dpi=dpi)
+    return fichier
+
+
+def _exporte_tache(tache):
+    donnees, fichier, titre = tache
+    return exporte_solution(donnees, fichier, titre)
+
+
+def exporte_solutions(taches, nb_processus=None):
+    """ Exporte plusieurs solutions sur nb_processus processus (None : tous les cœurs). taches : itérable de
+    (donnees, chemin, titre), les données étant produites par donnees_solution. Retourne les chemins écrits, dans
+    l'ordre de fin des rendus. """
+    with multiprocessing.get_context().Pool(nb_processus) as pool:
+        return list(pool.imap_unordered(_exporte_tache, taches, chunksize=4))
+
+
+def visualise_solution(solveur, titre="Rectangle Packing", fichier=None, format=None, etiquettes=None, mode="auto"):
+    """ Affiche la solution du solveur dans une fenêtre ou, si fichier est donné (chemin ou tampon), l'y écrit sans
+    ouvrir de fenêtre (voir exporte_solution). """
+    donnees = donnees_solution(solveur)
+    if fichier is not None:
+        return exporte_solution(donnees, fichier, titre, format, etiquettes=etiquettes, mode=mode)
+
+    import matplotlib.pyplot as plt  # seulement pour l'affichage interactif
+    fig, ax = plt.subplots(1, 1, figsize=(12, 10))
+    _dessine(ax, donnees, titre, etiquettes, mode)
     plt.tight_layout()
     plt.show()